@@ -0,0 +1,97 @@
+# email-platform/app/analytics.py
+# 📄 Dashboard summary: one FILTER-aggregate query over the send rollups plus
+#    the 10 latest sends, cached in-process for ANALYTICS_CACHE_SECONDS.
+#
+# The cached summary is keyed on version(): the newest SentEmail id plus the
+# rollup totals, read straight from the database. A send, open or delete by
+# any process (usually the scheduler daemon) changes it, so the next request
+# recomputes; the TTL only bounds time-of-day values such as sent_today.
+
+import threading
+import time as _time
+from typing import Callable, Optional
+
+from sqlmodel import Session, select
+from sqlalchemy import func
+
+from app.config import settings
+from app.models import EmailTemplate, SendRollup, SentEmail, Sequence
+
+
+class TTLCache:
+    """
+    One cached value, dropped after *ttl* seconds, when get() is called with
+    a different *version* than it was loaded under, or on invalidate().
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._value = None
+        self._version = None
+        self._expires = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, load: Callable, version=None):
+        with self._lock:
+            if (self._value is not None and version == self._version
+                    and _time.monotonic() < self._expires):
+                return self._value
+            generation = self._generation
+        value = load()  # outside the lock; concurrent misses may both load
+        with self._lock:
+            # a result loaded across an invalidate() may already be stale
+            if generation == self._generation and self.ttl > 0:
+                self._value, self._version = value, version
+                self._expires = _time.monotonic() + self.ttl
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._value = None
+            self._generation += 1
+
+
+summary_cache = TTLCache(settings.ANALYTICS_CACHE_SECONDS)
+
+
+def _total(status: Optional[str] = None):
+    """SUM of the rollup counters, optionally … FILTER (WHERE status = *status*)."""
+    agg = func.sum(SendRollup.total)
+    return func.coalesce(agg.filter(SendRollup.status == status) if status else agg, 0)
+
+
+def version(session: Session) -> tuple:
+    """Cheap fingerprint of the send history: (max SentEmail.id, rollup total, opened)."""
+    last = select(func.max(SentEmail.id)).scalar_subquery()
+    return tuple(session.exec(select(last, _total(), _total("opened"))).one())
+
+
+def summary(session: Session, sent_today: Optional[int] = None) -> dict:
+    """Totals, open rate and the 10 most recent sends with template/sequence names."""
+    all_, failed, opened = session.exec(
+        select(_total(), _total("failed"), _total("opened"))
+    ).one()
+
+    recent = session.exec(
+        select(
+            SentEmail.to,
+            SentEmail.subject,
+            SentEmail.status,
+            SentEmail.sent_at,
+            EmailTemplate.name.label("template_name"),
+            Sequence.name.label("sequence_name"),
+        )
+        .outerjoin(EmailTemplate, EmailTemplate.id == SentEmail.template_id)
+        .outerjoin(Sequence, Sequence.id == SentEmail.sequence_id)
+        .order_by(SentEmail.sent_at.desc(), SentEmail.id.desc())
+        .limit(10)
+    ).all()
+
+    return {
+        "total_sent":   all_,
+        "total_failed": failed,
+        "open_rate":    round(opened / all_ * 100, 2) if all_ else 0,
+        "sent_today":   sent_today,
+        "recent":       [dict(r._mapping) for r in recent],
+    }
@@ -0,0 +1,157 @@
+# email-platform/app/async_mailer.py
+# 📄 Concurrent batch sending over a few aiosmtplib connections
+
+import asyncio
+import queue
+import threading
+from typing import Iterable, Iterator, List, Tuple
+
+import aiosmtplib
+
+from app.config import settings
+from app.mailer import build_message
+
+
+class AsyncDispatcher:
+    """
+    Sends messages with at most *concurrency* in flight, sharing *connections*
+    SMTP sessions. Sessions are opened lazily and reused for the whole batch.
+    """
+
+    def __init__(self, concurrency: int = None, connections: int = None):
+        self.concurrency = max(1, concurrency or settings.SEND_CONCURRENCY)
+        self.connections = max(1, connections or settings.SEND_CONNECTIONS)
+        self._inflight = asyncio.Semaphore(self.concurrency)
+        # one slot per connection; None means "not connected yet"
+        self._slots: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.connections):
+            self._slots.put_nowait(None)
+        self._open: list = []
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=settings.SMTP_SERVER,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER or None,
+            password=settings.SMTP_PASSWORD or None,
+            start_tls=settings.SMTP_STARTTLS,
+            timeout=settings.SMTP_TIMEOUT,
+        )
+        await smtp.connect()
+        self._open.append(smtp)
+        return smtp
+
+    async def _discard(self, smtp) -> None:
+        if smtp is not None:
+            if smtp in self._open:
+                self._open.remove(smtp)
+            smtp.close()
+        return None
+
+    async def _deliver(self, msg) -> None:
+        """Send *msg* on a borrowed session, retrying once if it was dropped."""
+        for attempt in (1, 2):
+            smtp = await self._slots.get()
+            try:
+                if smtp is None or not smtp.is_connected:
+                    smtp = await self._discard(smtp)
+                    smtp = await self._connect()
+                await smtp.send_message(msg)
+            except aiosmtplib.SMTPServerDisconnected:
+                smtp = await self._discard(smtp)
+                if attempt == 2:
+                    raise
+                continue
+            except aiosmtplib.SMTPException:
+                # transaction failed on a live session – reset it and keep it
+                if smtp is not None:
+                    try:
+                        await smtp.rset()
+                    except Exception:
+                        smtp = await self._discard(smtp)
+                raise
+            except Exception:
+                smtp = await self._discard(smtp)
+                raise
+            finally:
+                self._slots.put_nowait(smtp)
+            return
+
+    async def send(self, job: dict) -> bool:
+        """*job* takes the same keyword arguments as mailer.send_email."""
+        async with self._inflight:
+            try:
+                msg = build_message(**job)
+                await self._deliver(msg)
+                return True
+            except Exception as e:
+                print(f"❌ Failed to send email to {job.get('to_email')}: {e}")
+                return False
+
+    async def send_message(self, msg) -> bool:
+        """Send an already rendered message."""
+        async with self._inflight:
+            try:
+                await self._deliver(msg)
+                return True
+            except Exception as e:
+                print(f"❌ Failed to send email to {msg['To']}: {e}")
+                return False
+
+    async def close(self) -> None:
+        for smtp in list(self._open):
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+        self._open.clear()
+
+    async def send_all(self, jobs: Iterable[dict]) -> List[bool]:
+        try:
+            return list(await asyncio.gather(*(self.send(j) for j in jobs)))
+        finally:
+            await self.close()
+
+
+def send_batch(jobs: List[dict], concurrency: int = None, connections: int = None) -> List[bool]:
+    """
+    Send a batch of jobs concurrently from synchronous code.
+    Returns one success flag per job, in the same order.
+    """
+    if not jobs:
+        return []
+    return asyncio.run(AsyncDispatcher(concurrency, connections).send_all(jobs))
+
+
+def iter_send(jobs: List[dict], concurrency: int = None, connections: int = None) -> Iterator[Tuple[int, bool]]:
+    """
+    Like send_batch, but yields (index, success) as each job finishes, so the
+    caller can record results while the rest of the batch is still in flight.
+    The event loop runs in a helper thread.
+    """
+    if not jobs:
+        return
+    done: queue.Queue = queue.Queue()
+
+    async def _run():
+        dispatcher = AsyncDispatcher(concurrency, connections)
+
+        async def _one(i, job):
+            done.put((i, await dispatcher.send(job)))
+
+        try:
+            await asyncio.gather(*(_one(i, j) for i, j in enumerate(jobs)))
+        finally:
+            await dispatcher.close()
+
+    def _thread():
+        try:
+            asyncio.run(_run())
+        finally:
+            done.put(None)
+
+    worker = threading.Thread(target=_thread, name="send-batch", daemon=True)
+    worker.start()
+    while (item := done.get()) is not None:
+        yield item
+    worker.join()
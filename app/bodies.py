@@ -0,0 +1,79 @@
+# email-platform/app/bodies.py
+# 📄 Content-addressed, compressed store for sent email bodies
+#
+# SentEmail rows reference an EmailBody by the SHA-256 of its content, so a
+# template body sent to thousands of prospects is stored once, zlib-compressed.
+# Bodies are only decompressed when one is actually viewed.
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from sqlmodel import Session, select
+
+from app.bulk import bulk_upsert, chunked
+from app.models import EmailBody
+
+CACHE_SIZE = 128  # decompressed bodies kept in memory (content never changes)
+
+_cache: "OrderedDict[str, str]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def body_hash(body: str) -> str:
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def store(session: Session, bodies: Iterable[str]) -> dict:
+    """
+    Make sure every body is in the store (INSERT … ON CONFLICT DO NOTHING)
+    and return {body: hash}. Does not commit.
+    """
+    hashes, rows = {}, []
+    for body in bodies:
+        if body in hashes:
+            continue
+        raw = body.encode("utf-8")
+        hashes[body] = hashlib.sha256(raw).hexdigest()
+        rows.append({"hash": hashes[body], "data": zlib.compress(raw), "size": len(raw)})
+    bulk_upsert(session, EmailBody, rows, conflict=["hash"], update=[])
+    return hashes
+
+
+def load(session: Session, h: Optional[str]) -> Optional[str]:
+    """Decompressed body for hash *h* (None if unknown)."""
+    if h is None:
+        return None
+    with _lock:
+        if h in _cache:
+            _cache.move_to_end(h)
+            return _cache[h]
+    data = session.exec(select(EmailBody.data).where(EmailBody.hash == h)).first()
+    return None if data is None else _remember(h, data)
+
+
+def load_many(session: Session, hashes: Iterable[str]) -> dict:
+    """{hash: body} for several hashes, one IN query for those not cached."""
+    out, missing = {}, []
+    for h in set(filter(None, hashes)):
+        with _lock:
+            body = _cache.get(h)
+        if body is None:
+            missing.append(h)
+        else:
+            out[h] = body
+    for chunk in chunked(missing):
+        for h, data in session.exec(select(EmailBody.hash, EmailBody.data).where(EmailBody.hash.in_(chunk))):
+            out[h] = _remember(h, data)
+    return out
+
+
+def _remember(h: str, data: bytes) -> str:
+    body = zlib.decompress(data).decode("utf-8")
+    with _lock:
+        _cache[h] = body
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return body
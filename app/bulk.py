@@ -0,0 +1,104 @@
+# email-platform/app/bulk.py
+# 📄 Set-based helpers for large writes: chunked IN lists and fast bulk insert
+
+import csv
+import io
+from typing import Iterable, Iterator, List
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+IN_CHUNK = 500  # ids per IN (...) list – stays under SQLite's bound-parameter limit
+
+
+def chunked(items: Iterable, size: int = IN_CHUNK) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_value(v):
+    if v is None:
+        return "\\N"
+    return v.isoformat() if hasattr(v, "isoformat") else v
+
+
+def bulk_insert(session, model, rows: List[dict]) -> int:
+    """
+    Insert *rows* (dicts keyed by column name) into *model*'s table inside the
+    session's transaction. Postgres (psycopg2) streams them with COPY FROM
+    STDIN; other databases get one executemany INSERT. Returns the row count.
+    """
+    if not rows:
+        return 0
+    conn = session.connection()
+    table = model.__table__
+    columns = list(rows[0])
+
+    if conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2":
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for row in rows:
+            writer.writerow([_copy_value(row[c]) for c in columns])
+        buf.seek(0)
+        cols = ", ".join(f'"{c}"' for c in columns)
+        with conn.connection.cursor() as cur:
+            cur.copy_expert(
+                f'COPY "{table.name}" ({cols}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')', buf
+            )
+        return len(rows)
+
+    conn.execute(insert(table), rows)
+    return len(rows)
+
+
+def _insert_on_conflict(session, model):
+    conn = session.connection()
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(conn.dialect.name)
+    if dialect is None:
+        raise NotImplementedError(f"ON CONFLICT is not supported on {conn.dialect.name}")
+    return conn, dialect.insert(model.__table__)
+
+
+def bulk_upsert(session, model, rows: List[dict], conflict: List[str], update: List[str]) -> int:
+    """
+    INSERT … ON CONFLICT (*conflict*) DO UPDATE SET *update* for all *rows*
+    as one executemany statement (Postgres and SQLite); an empty *update*
+    means DO NOTHING. *rows* must not repeat a conflict key. Returns the
+    row count.
+    """
+    if not rows:
+        return 0
+    conn, stmt = _insert_on_conflict(session, model)
+    if update:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict,
+            set_={c: stmt.excluded[c] for c in update},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict)
+    conn.execute(stmt, rows)
+    return len(rows)
+
+
+def bulk_increment(session, model, rows: List[dict], conflict: List[str], counters: List[str]) -> int:
+    """
+    Add each row's *counters* onto the stored row with the same *conflict*
+    key (inserting it if missing) – INSERT … ON CONFLICT DO UPDATE SET
+    c = c + excluded.c, one executemany statement. Returns the row count.
+    """
+    if not rows:
+        return 0
+    conn, stmt = _insert_on_conflict(session, model)
+    table = model.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=conflict,
+        set_={c: table.c[c] + stmt.excluded[c] for c in counters},
+    )
+    conn.execute(stmt, rows)
+    return len(rows)
@@ -21,9 +21,45 @@ SMTP_USER=your_smtp_username@example.com
 SMTP_PASSWORD=your_smtp_password
 # Optional Bcc address (comma-separated)
 SMTP_BCC=manager@example.com
+# Set to false for relays that do not offer STARTTLS (e.g. a local test sink)
+SMTP_STARTTLS=true
+# Connection pool: max open sessions, idle seconds before NOOP check / before discard
+SMTP_POOL_SIZE=4
+SMTP_POOL_CHECK_AFTER=30
+SMTP_POOL_IDLE_TIMEOUT=240
+SMTP_TIMEOUT=30
+# Async dispatch: messages in flight at once, SMTP connections they share
+SEND_CONCURRENCY=20
+SEND_CONNECTIONS=4
+# Send loop: rows claimed per round, results committed every N messages / seconds
+SEND_CLAIM_BATCH=500
+SEND_COMMIT_EVERY=100
+SEND_COMMIT_SECONDS=5
+# Send pipeline: queue size between stages, render threads
+PIPELINE_QUEUE_SIZE=500
+PIPELINE_RENDER_WORKERS=2
+
+# ── Background jobs (large sequence assignments) ──────────────────────────────
+JOB_WORKERS=2
+JOB_CHUNK_SIZE=1000
+# Seconds a job's owner lease lasts without a heartbeat (then it is failed)
+JOB_LEASE_SECONDS=60
+# Prospect import: rows per insert batch, per-row errors returned at most
+IMPORT_BATCH_SIZE=1000
+IMPORT_MAX_ERRORS=1000
+# Seconds GET /analytics/summary is served from memory (0 = no cache)
+ANALYTICS_CACHE_SECONDS=10
 
 # ── Scheduler & Rate Limits ────────────────────────────────────────────────────
 MAX_EMAILS_PER_DAY=100
+# Token buckets on top of the daily cap (0 = off); per-sender caps as
+# account=minute/hour/day, separated by ';'
+RATE_LIMIT_PER_MINUTE=0
+RATE_LIMIT_PER_HOUR=0
+SENDER_RATE_LIMITS=your_smtp_username@example.com=20/400/1000
+# Scheduler daemon (python -m app.scheduler_daemon)
+SCHEDULER_POLL_SECONDS=15
+SCHEDULER_HEALTH_PORT=8001
 # (Optional) a shared secret if you secure your scheduler endpoints
 SCHEDULER_SECRET=your_scheduler_secret_token
 """
@@ -52,10 +88,81 @@ class Settings:
     SMTP_PASSWORD: str = os.getenv("SMTP_PASSWORD", "password")
     # Optional BCC for all outgoing mail
     SMTP_BCC: str = os.getenv("SMTP_BCC", "")
+    SMTP_STARTTLS: bool = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+    SMTP_TIMEOUT: float = float(os.getenv("SMTP_TIMEOUT", 30))
+
+    # ── SMTP Connection Pool ────────────────────────────────────────────────────
+    # Authenticated sessions are kept open and reused across messages.
+    #   SMTP_POOL_SIZE          max sessions open at once
+    #   SMTP_POOL_CHECK_AFTER   idle seconds after which a session is NOOP-checked
+    #   SMTP_POOL_IDLE_TIMEOUT  idle seconds after which a session is dropped
+    SMTP_POOL_SIZE: int = int(os.getenv("SMTP_POOL_SIZE", 4))
+    SMTP_POOL_CHECK_AFTER: float = float(os.getenv("SMTP_POOL_CHECK_AFTER", 30))
+    SMTP_POOL_IDLE_TIMEOUT: float = float(os.getenv("SMTP_POOL_IDLE_TIMEOUT", 240))
+
+    # ── Async Dispatch ──────────────────────────────────────────────────────────
+    # Scheduler batches are sent with aiosmtplib: up to SEND_CONCURRENCY
+    # messages in flight, multiplexed over SEND_CONNECTIONS SMTP sessions.
+    SEND_CONCURRENCY: int = int(os.getenv("SEND_CONCURRENCY", 20))
+    SEND_CONNECTIONS: int = int(os.getenv("SEND_CONNECTIONS", 4))
+    # Due rows are claimed SEND_CLAIM_BATCH at a time; results are committed
+    # every SEND_COMMIT_EVERY messages or SEND_COMMIT_SECONDS, whichever first
+    SEND_CLAIM_BATCH: int = int(os.getenv("SEND_CLAIM_BATCH", 500))
+    SEND_COMMIT_EVERY: int = int(os.getenv("SEND_COMMIT_EVERY", 100))
+    SEND_COMMIT_SECONDS: float = float(os.getenv("SEND_COMMIT_SECONDS", 5))
+    # app.pipeline: bounded queue between stages, threads rendering messages
+    PIPELINE_QUEUE_SIZE: int = int(os.getenv("PIPELINE_QUEUE_SIZE", 500))
+    PIPELINE_RENDER_WORKERS: int = int(os.getenv("PIPELINE_RENDER_WORKERS", 2))
+
+    # ── Template Cache ──────────────────────────────────────────────────────────
+    # Number of compiled Jinja2 templates (subject/body) kept in memory
+    TEMPLATE_CACHE_SIZE: int = int(os.getenv("TEMPLATE_CACHE_SIZE", 256))
+
+    # ── Background Jobs ─────────────────────────────────────────────────────────
+    # Threads running jobs (app.jobs), and prospects handled per committed chunk
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 2))
+    JOB_CHUNK_SIZE: int = int(os.getenv("JOB_CHUNK_SIZE", 1000))
+    # Owning process renews its jobs' lease every third of this; jobs whose
+    # lease ran out (process gone) are failed by any other process
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", 60))
+
+    # ── Prospect Import ─────────────────────────────────────────────────────────
+    # POST /prospects/import validates and inserts IMPORT_BATCH_SIZE rows at a
+    # time and reports at most IMPORT_MAX_ERRORS per-row errors
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+    IMPORT_MAX_ERRORS: int = int(os.getenv("IMPORT_MAX_ERRORS", 1000))
+
+    # ── Analytics ───────────────────────────────────────────────────────────────
+    # GET /analytics/summary result cache lifetime (app.analytics); any change
+    # to the send history (from any process) invalidates it early. 0 disables it.
+    ANALYTICS_CACHE_SECONDS: float = float(os.getenv("ANALYTICS_CACHE_SECONDS", 10))
 
     # ── Email Rate Limit ────────────────────────────────────────────────────────
     # Maximum emails sent per calendar day
     MAX_EMAILS_PER_DAY: int = int(os.getenv("MAX_EMAILS_PER_DAY", 100))
+    # Token buckets (app.rate_limit): the daily cap above plus optional
+    # per-minute / per-hour buckets (0 = off), refilled continuously.
+    RATE_LIMIT_PER_MINUTE: int = int(os.getenv("RATE_LIMIT_PER_MINUTE", 0))
+    RATE_LIMIT_PER_HOUR: int = int(os.getenv("RATE_LIMIT_PER_HOUR", 0))
+    # Per sender account: "a@x.com=30/500/2000;b@y.com=/200/" (minute/hour/day)
+    SENDER_RATE_LIMITS: str = os.getenv("SENDER_RATE_LIMITS", "")
+
+    # ── Scheduler Daemon ────────────────────────────────────────────────────────
+    # `python -m app.scheduler_daemon` keeps due emails in an in-memory heap.
+    #   SCHEDULER_POLL_SECONDS     how often new ScheduledEmail rows are picked up
+    #   SCHEDULER_RESYNC_SECONDS   how often the heap is rebuilt (edits/deletes)
+    #   SCHEDULER_HORIZON_HOURS    only rows due within this horizon are held
+    #   SCHEDULER_BATCH_SIZE       max emails handed to one scheduler run
+    SCHEDULER_POLL_SECONDS: float = float(os.getenv("SCHEDULER_POLL_SECONDS", 15))
+    SCHEDULER_RESYNC_SECONDS: float = float(os.getenv("SCHEDULER_RESYNC_SECONDS", 3600))
+    SCHEDULER_HORIZON_HOURS: float = float(os.getenv("SCHEDULER_HORIZON_HOURS", 24))
+    SCHEDULER_BATCH_SIZE: int = int(os.getenv("SCHEDULER_BATCH_SIZE", 200))
+    # Claimed rows not finished within this lease return to the queue
+    SCHEDULER_CLAIM_LEASE_SECONDS: int = int(os.getenv("SCHEDULER_CLAIM_LEASE_SECONDS", 600))
+    # Heartbeat file read by GET /scheduler/health, and the daemon's own
+    # health port (0 disables it)
+    SCHEDULER_HEARTBEAT_FILE: str = os.getenv("SCHEDULER_HEARTBEAT_FILE", "logs/scheduler_heartbeat.json")
+    SCHEDULER_HEALTH_PORT: int = int(os.getenv("SCHEDULER_HEALTH_PORT", 8001))
 
     # ── Scheduler Secret (optional) ──────────────────────────────────────────────
     # If you protect your /run-scheduler endpoint with a token,
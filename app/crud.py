@@ -1,12 +1,12 @@
 """CRUD helpers for email-platform – SQLAlchemy 2.x compatible."""
 
 from __future__ import annotations
-import random
-from datetime import datetime, timedelta, date, time
+from datetime import datetime, date, time
 from typing import List
 
 from sqlmodel import Session, select
-from sqlalchemy import func, delete
+from sqlalchemy import func, delete, update
+from sqlalchemy.exc import IntegrityError
 
 from app.models import (
     Prospect,
@@ -17,45 +17,67 @@ from app.models import (
     SentEmail,
     EmailTemplateUpdate,
 )
+from app import rollups
 from app.config import settings
+from app.template_cache import template_cache
+from app.bulk import bulk_insert, bulk_upsert, chunked
+from app.utils import normalize_email
+from app.planner import capacity_first_days, plan_send_times, to_datetimes
 
 # ─────────────────────────────── helpers ───────────────────────────────
-def _next_working(d: date) -> date:
-    """Return next weekday ≥ d (skipping Sat/Sun)."""
-    while d.weekday() >= 5:
-        d += timedelta(days=1)
-    return d
-
-def _random_times(base: date, n: int, start_h: int = 9, end_h: int = 21) -> list[datetime]:
-    """Return n unique datetimes between start_h and end_h on date base."""
-    minutes = (end_h - start_h) * 60
-    if n > minutes:
-        raise ValueError("window too small")
-    picks = random.sample(range(minutes), n)
-    return [
-        datetime.combine(base, time(start_h)) + timedelta(minutes=m)
-        for m in sorted(picks)
-    ]
-
-def _already_scheduled(session: Session, d: date) -> int:
-    """Count how many ScheduledEmail have send_at on calendar-day d."""
-    start = datetime.combine(d, time.min)
-    end   = datetime.combine(d, time.max)
-    return session.exec(
-        select(func.count()).select_from(ScheduledEmail)
-        .where(
-            ScheduledEmail.send_at >= start,
-            ScheduledEmail.send_at <= end
-        )
-    ).scalar_one()  # COUNT(*) always returns exactly one row
+def scheduled_per_day(session: Session, since: date) -> dict[date, int]:
+    """ScheduledEmail count per calendar day from *since* on (one GROUP BY)."""
+    day = func.date(ScheduledEmail.send_at)
+    rows = session.exec(
+        select(day, func.count())
+        .where(ScheduledEmail.send_at >= datetime.combine(since, time.min))
+        .group_by(day)
+    ).all()
+    # SQLite returns 'YYYY-MM-DD' strings, Postgres date objects
+    return {date.fromisoformat(str(d)): n for d, n in rows}
 
 # ───────────────────────── Prospect CRUD ───────────────────────────────
-def create_prospect(session: Session, p: Prospect) -> Prospect:
+PROSPECT_UPSERT_FIELDS = ["name", "title", "company"]
+
+def upsert_prospects(session: Session, rows: list[dict]) -> tuple[int, int]:
+    """
+    Insert-or-update prospects by normalized email (one lookup + one
+    ON CONFLICT statement). Existing rows get name/title/company updated;
+    their sequence and unsubscribe flag are kept. Returns (inserted, updated).
+    Does not commit.
+    """
+    by_email = {}
+    for row in rows:
+        row = {**row, "email": normalize_email(row["email"])}
+        by_email[row["email"]] = row  # last one wins within the batch
+    existing = set()
+    for emails in chunked(by_email):
+        existing.update(session.exec(select(Prospect.email).where(Prospect.email.in_(emails))).all())
+    now = datetime.utcnow()
+    values = [
+        {"title": None, "company": None, **row, "created_at": now, "unsubscribed": False}
+        for row in by_email.values()
+    ]
+    bulk_upsert(session, Prospect, values, conflict=["email"], update=PROSPECT_UPSERT_FIELDS)
+    return len(values) - len(existing), len(existing)
+
+def create_prospect(session: Session, p: Prospect) -> Prospect | None:
+    """Insert *p* with its email normalized; None if that email is already taken."""
+    p.email = normalize_email(p.email)
+    if get_prospect_by_email(session, p.email):
+        return None
     session.add(p)
-    session.commit()
+    try:
+        session.commit()
+    except IntegrityError:  # inserted concurrently
+        session.rollback()
+        return None
     session.refresh(p)
     return p
 
+def get_prospect_by_email(session: Session, email: str) -> Prospect | None:
+    return session.exec(select(Prospect).where(Prospect.email == normalize_email(email))).first()
+
 def get_prospects(session: Session) -> list[Prospect]:
     return session.exec(select(Prospect)).all()
 
@@ -66,17 +88,83 @@ def update_prospect(session: Session, p: Prospect) -> Prospect:
     return p
 
 def delete_prospect(session: Session, pid: int) -> bool:
-    """Delete prospect and any related ScheduledEmail and SentEmail rows."""
+    """Delete prospect and any related ScheduledEmail and SentEmail rows (and their rollup counts)."""
     prospect = session.get(Prospect, pid)
     if not prospect:
         return False
     # bulk-delete their schedules and sent records
     session.exec(delete(ScheduledEmail).where(ScheduledEmail.prospect_id == pid))
+    rollups.forget(session, SentEmail.prospect_id == pid)
     session.exec(delete(SentEmail).where(SentEmail.prospect_id == pid))
     session.delete(prospect)
     session.commit()
     return True
 
+def bulk_delete_prospects(session: Session, ids: List[int]) -> dict[int, str]:
+    """
+    Delete prospects with their ScheduledEmail and SentEmail rows as
+    set-based DELETEs per id chunk, taking the sends off the rollup counters
+    in the same transaction. Returns {id: "deleted" | "not_found"}.
+    Does not commit.
+    """
+    found = set()
+    for chunk in chunked(dict.fromkeys(ids)):
+        found.update(session.exec(select(Prospect.id).where(Prospect.id.in_(chunk))).all())
+        session.exec(delete(ScheduledEmail).where(ScheduledEmail.prospect_id.in_(chunk)))
+        rollups.forget(session, SentEmail.prospect_id.in_(chunk))
+        session.exec(delete(SentEmail).where(SentEmail.prospect_id.in_(chunk)))
+        session.exec(delete(Prospect).where(Prospect.id.in_(chunk)))
+    return {pid: "deleted" if pid in found else "not_found" for pid in ids}
+
+def bulk_patch_prospects(session: Session, patches: List[dict]) -> dict[int, str]:
+    """
+    Apply partial updates ({"id", field: value, …}) and write only the rows
+    that actually change, as one executemany UPDATE. Clearing sequence_id
+    drops the prospect's scheduled emails. Returns {id: "updated" |
+    "unchanged" | "not_found" | "conflict"} (conflict = email taken).
+    Does not commit.
+    """
+    current = {}
+    for chunk in chunked(dict.fromkeys(p["id"] for p in patches)):
+        current.update({p.id: p for p in session.exec(select(Prospect).where(Prospect.id.in_(chunk))).all()})
+
+    emails = {normalize_email(p["email"]) for p in patches if p.get("email")}
+    owner = {}
+    for chunk in chunked(emails):
+        owner.update(session.exec(select(Prospect.email, Prospect.id).where(Prospect.email.in_(chunk))).all())
+
+    results, rows, cleared = {}, [], []
+    for patch in patches:
+        pid = patch["id"]
+        p = current.get(pid)
+        if p is None:
+            results[pid] = "not_found"
+            continue
+        changes = {
+            k: v for k, v in patch.items()
+            if k != "id" and getattr(p, k) != v and (v is not None or k not in ("name", "email"))
+        }
+        if "email" in changes:
+            changes["email"] = normalize_email(changes["email"])
+            if changes["email"] == p.email:
+                del changes["email"]
+            elif owner.setdefault(changes["email"], pid) != pid:
+                results[pid] = "conflict"
+                continue
+        if not changes:
+            results[pid] = "unchanged"
+            continue
+        if "sequence_id" in changes and changes["sequence_id"] is None:
+            cleared.append(pid)
+        rows.append({"id": pid, **changes})
+        results[pid] = "updated"
+
+    for chunk in chunked(cleared):
+        session.exec(delete(ScheduledEmail).where(ScheduledEmail.prospect_id.in_(chunk)))
+    if rows:
+        session.execute(update(Prospect), rows)
+    return results
+
 # ───────────────────────── Template CRUD ───────────────────────────────
 def create_template(session: Session, t: EmailTemplate) -> EmailTemplate:
     session.add(t)
@@ -96,6 +184,7 @@ def update_template(session: Session, tid: int, up: EmailTemplateUpdate) -> Emai
     session.add(tpl)
     session.commit()
     session.refresh(tpl)
+    template_cache.invalidate(tid)
     return tpl
 
 def delete_template(session: Session, tid: int) -> bool | None:
@@ -110,6 +199,7 @@ def delete_template(session: Session, tid: int) -> bool | None:
         return False
     session.delete(tpl)
     session.commit()
+    template_cache.invalidate(tid)
     return True
 
 # ─────────────────────── Sequence & Steps CRUD ────────────────────────
@@ -159,10 +249,19 @@ def bulk_assign_sequence_to_prospects(
     sequence_id: int,
     ventilate_days: int = 0,
     start_date: date | None = None,
+    seed: int | None = None,
+    planning: str = "random",
 ):
     """
     Assign *sequence_id* to each prospect in *prospect_ids* and create
     corresponding ScheduledEmail rows, spreading first step over ventilate_days.
+    Set-based: per chunk of ids one UPDATE and one DELETE, then a single bulk
+    insert (COPY on Postgres) of all new schedules, in one transaction.
+    Send times come from planner.plan_send_times (*seed* makes them
+    reproducible). With *planning* "greedy" or "proportional", first days are
+    fitted to the per-day capacity (MAX_EMAILS_PER_DAY) left by what is
+    already scheduled instead of being drawn at random; raises ValueError if
+    it doesn't fit.
     """
     if start_date is None:
         start_date = date.today()
@@ -174,44 +273,49 @@ def bulk_assign_sequence_to_prospects(
     if not steps:
         return
 
-    # random offsets for day-0 send
-    offsets = (
-        [0] * len(prospect_ids)
-        if ventilate_days == 0
-        else [random.randint(0, ventilate_days - 1) for _ in prospect_ids]
-    )
-    first_dates = [start_date + timedelta(days=o) for o in offsets]
+    # only prospects that exist, in request order
+    wanted = list(dict.fromkeys(prospect_ids))
+    existing = set()
+    for ids in chunked(wanted):
+        existing.update(session.exec(select(Prospect.id).where(Prospect.id.in_(ids))).all())
+    target_ids = [pid for pid in wanted if pid in existing]
 
-    for pid, first_d in zip(prospect_ids, first_dates):
-        prospect = session.get(Prospect, pid)
-        if not prospect:
-            continue
+    # attach sequence and purge old schedules – one statement per id chunk
+    for ids in chunked(target_ids):
+        session.exec(
+            update(Prospect).where(Prospect.id.in_(ids))
+            .values(sequence_id=sequence_id)
+            .execution_options(synchronize_session=False)
+        )
+        session.exec(delete(ScheduledEmail).where(ScheduledEmail.prospect_id.in_(ids)))
 
-        # attach sequence
-        prospect.sequence_id = sequence_id
-        session.add(prospect)
-
-        # purge any old schedule
-        session.exec(delete(ScheduledEmail).where(ScheduledEmail.prospect_id == pid))
-
-        # schedule each step
-        for step in steps:
-            send_day = _next_working(first_d + timedelta(days=step.delay_days))
-            send_dt = _random_times(send_day, 1)[0]
-
-            # prevent scheduling in the past
-            now = datetime.now()
-            if send_day == now.date() and send_dt < now:
-                send_dt = now + timedelta(minutes=30)
-
-            sched = ScheduledEmail(
-                prospect_id=pid,
-                sequence_id=sequence_id,
-                template_id=step.template_id,
-                send_at=send_dt,
-                status="pending",
-            )
-            session.add(sched)
+    # send times for the whole prospect × step matrix in one vectorized pass
+    delays = [step.delay_days for step in steps]
+    first_days = None
+    if planning != "random":
+        first_days = capacity_first_days(
+            len(target_ids), delays, start_date,
+            load=scheduled_per_day(session, start_date),
+            capacity=settings.MAX_EMAILS_PER_DAY,
+            mode=planning, ventilate_days=ventilate_days,
+        )
+    times = plan_send_times(
+        len(target_ids), delays, start_date,
+        ventilate_days=ventilate_days, seed=seed, first_days=first_days,
+    )
+    send_ats = iter(to_datetimes(times))
+    rows = [
+        {
+            "prospect_id": pid,
+            "sequence_id": sequence_id,
+            "template_id": step.template_id,
+            "send_at": next(send_ats),
+            "status": "pending",
+        }
+        for pid in target_ids
+        for step in steps
+    ]
+    bulk_insert(session, ScheduledEmail, rows)
 
     session.commit()
 
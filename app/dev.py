@@ -7,6 +7,7 @@ import logging
 from faker import Faker
 from sqlalchemy import text
 
+from app import analytics, crud, rollups
 from app.database import get_session
 from app.models import (
     Prospect,
@@ -44,7 +45,10 @@ def reset_table(table: str, session: Session = Depends(get_session)):
     if not model:
         raise HTTPException(status_code=400, detail="Unknown table")
     deleted = session.query(model).delete(synchronize_session=False)
+    if model is SentEmail:
+        rollups.rebuild(session)  # counters follow the emptied table
     session.commit()
+    analytics.summary_cache.invalidate()
     return {"message": f"All data from '{table}' deleted.", "deleted": deleted}
 
 # --- Bulk insert dummy/test data ---
@@ -56,18 +60,17 @@ def generate_prospects(n: int = 10, session: Session = Depends(get_session)):
     """
     dev_only()
     fake = Faker()
-    prospects = []
-    for _ in range(n):
-        p = Prospect(
-            name=fake.name(),
-            email=fake.unique.email(),
-            company=fake.company(),
-            title=fake.job(),
-        )
-        session.add(p)
-        prospects.append(p)
+    added, updated = crud.upsert_prospects(session, [
+        {
+            "name": fake.name(),
+            "email": fake.unique.email(),
+            "company": fake.company(),
+            "title": fake.job(),
+        }
+        for _ in range(n)
+    ])
     session.commit()
-    return {"added": len(prospects)}
+    return {"added": added, "updated": updated}
 
 @router.post("/generate-templates")
 def generate_templates(n: int = 5, session: Session = Depends(get_session)):
@@ -116,6 +119,7 @@ def reset_all_hard(session: Session = Depends(get_session)):
         session.execute(text("""
             TRUNCATE TABLE
                 sentemail,
+                sendrollup,
                 scheduledemail,
                 sequencestep,
                 sequence,
@@ -138,14 +142,11 @@ def insert_test_prospect(session: Session = Depends(get_session)):
     """
     from datetime import datetime
     dev_only()
-    prospect = Prospect(
+    prospect = crud.create_prospect(session, Prospect(
         name="Test User",
         email="user@testcorp.com",
         company="TestCorp"
-    )
-    session.add(prospect)
-    session.commit()
-    session.refresh(prospect)
+    )) or crud.get_prospect_by_email(session, "user@testcorp.com")
 
     template = EmailTemplate(
         name="Test Template",
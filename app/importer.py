@@ -0,0 +1,141 @@
+# email-platform/app/importer.py
+# 📄 Streaming prospect import (CSV or NDJSON)
+#
+# Rows are read one at a time from a file object, validated and upserted by
+# normalized email in batches of IMPORT_BATCH_SIZE (one lookup + one
+# ON CONFLICT statement + one commit per batch), so memory stays flat
+# whatever the file size and re-importing a file updates instead of duplicating.
+
+import codecs
+import csv
+import json
+from typing import IO, Iterator, Optional
+
+from sqlmodel import Session
+
+from app import crud
+from app.config import settings
+from app.database import engine
+from app.utils import normalize_email, validate_email
+
+FIELDS = ("name", "email", "title", "company")
+
+
+def detect_format(content_type: str = "", filename: str = "") -> str:
+    content_type, filename = (content_type or "").lower(), (filename or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type or filename.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def _iter_records(fobj: IO[bytes], fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, record, parse error) without reading the whole file."""
+    # a StreamReader rather than io.TextIOWrapper: before Python 3.11
+    # SpooledTemporaryFile (raw bodies, Starlette uploads) has no readable()
+    text = codecs.getreader("utf-8-sig")(fobj)
+    if fmt == "ndjson":
+        for n, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError as e:
+                yield n, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(rec, dict):
+                yield n, None, "expected a JSON object"
+                continue
+            yield n, rec, None
+    else:
+        reader = csv.DictReader(text)
+        if reader.fieldnames:
+            reader.fieldnames = [(f or "").strip().lower() for f in reader.fieldnames]
+        for rec in reader:
+            yield reader.line_num, rec, None
+
+
+def _clean(rec: dict) -> tuple[Optional[dict], Optional[str]]:
+    row = {k: (str(rec.get(k) or "").strip() or None) for k in FIELDS}
+    if not row["name"]:
+        return None, "missing name"
+    if not row["email"]:
+        return None, "missing email"
+    if not validate_email(row["email"]):
+        return None, f"invalid email {row['email']!r}"
+    return row, None
+
+
+class ImportResult:
+    def __init__(self):
+        self.rows = 0
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.errors: list[dict] = []
+        self.error_count = 0
+
+    def _note(self, row: int, message: str) -> None:
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def error(self, row: int, message: str) -> None:
+        self.error_count += 1
+        self._note(row, message)
+
+    def skip(self, row: int, message: str) -> None:
+        self.skipped += 1
+        self._note(row, message)
+
+    def as_dict(self) -> dict:
+        return {
+            "rows":             self.rows,
+            "inserted":         self.inserted,
+            "updated":          self.updated,
+            "skipped":          self.skipped,
+            "failed":           self.error_count,
+            "errors":           self.errors,
+            "errors_truncated": self.error_count + self.skipped > len(self.errors),
+        }
+
+
+def _flush(session: Session, batch: list[tuple[int, dict]], result: ImportResult) -> None:
+    """Upsert a batch by normalized email; repeats within the batch are skipped."""
+    if not batch:
+        return
+    seen, rows = set(), []
+    for n, row in batch:
+        row["email"] = normalize_email(row["email"])
+        if row["email"] in seen:
+            result.skip(n, f"duplicate email {row['email']!r} earlier in the file")
+            continue
+        seen.add(row["email"])
+        rows.append(row)
+    inserted, updated = crud.upsert_prospects(session, rows)
+    session.commit()
+    result.inserted += inserted
+    result.updated += updated
+
+
+def import_prospects(fobj: IO[bytes], fmt: str = "csv", batch_size: int = None) -> dict:
+    """Import prospects from a CSV (header row) or NDJSON file object."""
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    result = ImportResult()
+    batch: list[tuple[int, dict]] = []
+    with Session(engine) as session:
+        try:
+            for n, rec, err in _iter_records(fobj, fmt):
+                result.rows += 1
+                row = None
+                if err is None:
+                    row, err = _clean(rec)
+                if err:
+                    result.error(n, err)
+                    continue
+                batch.append((n, row))
+                if len(batch) >= batch_size:
+                    _flush(session, batch, result)
+                    batch = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            result.error(result.rows + 1, f"unreadable input: {e}")
+        _flush(session, batch, result)
+    return result.as_dict()
@@ -0,0 +1,176 @@
+# email-platform/app/jobs.py
+# 📄 Background jobs: long-running work off the request path
+#
+# A Job row records what to do (kind + JSON params) and its progress; an
+# in-process thread pool runs it in chunks, committing and updating the
+# row after each one. GET /jobs/{id} reports progress and throughput.
+#
+# Each job is owned by the process that queued it (owner = OWNER_ID),
+# which renews the job's lease from a heartbeat thread. Only jobs whose
+# lease expired – their process died – are failed as interrupted, so
+# restarting one API worker never touches jobs another one is running.
+
+import json
+import threading
+import time as _time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from sqlmodel import Session, select
+from sqlalchemy import or_, update
+
+from app import crud
+from app.bulk import chunked
+from app.config import settings
+from app.database import engine
+from app.models import Job
+from app.send_queue import WORKER_ID
+
+# hostname:pid repeats when a container restarts, so add a per-boot suffix:
+# a restarted process must not renew (or spare) its predecessor's jobs
+OWNER_ID = f"{WORKER_ID}:{uuid.uuid4().hex[:12]}"
+
+_pool = ThreadPoolExecutor(max_workers=settings.JOB_WORKERS, thread_name_prefix="job")
+_heartbeat: threading.Thread | None = None
+_heartbeat_lock = threading.Lock()
+
+ACTIVE = ("queued", "running")
+
+
+def _lease() -> datetime:
+    return datetime.utcnow() + timedelta(seconds=settings.JOB_LEASE_SECONDS)
+
+
+def _set(session: Session, job_id: int, **values) -> None:
+    session.exec(update(Job).where(Job.id == job_id).values(**values))
+    session.commit()
+
+
+# ────────────── job kinds ──────────────
+def _assign_sequence(session: Session, job: Job, params: dict) -> None:
+    """Assign a sequence chunk by chunk; each chunk is its own transaction."""
+    start = date.fromisoformat(params["start_date"]) if params.get("start_date") else date.today()
+    done = 0
+    for ids in chunked(params["prospect_ids"], settings.JOB_CHUNK_SIZE):
+        crud.bulk_assign_sequence_to_prospects(
+            session, ids, params["sequence_id"],
+            ventilate_days=params.get("ventilate_days") or 0,
+            start_date=start,
+            planning=params.get("planning") or "random",
+        )
+        done += len(ids)
+        _set(session, job.id, done=done)
+
+
+KINDS = {
+    "assign_sequence": _assign_sequence,
+}
+
+
+# ────────────── runner ──────────────
+def _run(job_id: int) -> None:
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        if job is None or job.status != "queued":
+            return
+        _set(session, job_id, status="running", started_at=datetime.utcnow())
+        try:
+            KINDS[job.kind](session, job, json.loads(job.params))
+        except Exception as e:
+            session.rollback()
+            traceback.print_exc()
+            _set(session, job_id, status="failed", error=str(e), finished_at=datetime.utcnow())
+            return
+        _set(session, job_id, status="done", finished_at=datetime.utcnow())
+
+
+def submit(session: Session, kind: str, params: dict, total: int) -> Job:
+    """Record a queued job and hand it to the worker pool."""
+    if kind not in KINDS:
+        raise ValueError(f"unknown job kind {kind!r}")
+    start_heartbeat()
+    job = Job(kind=kind, params=json.dumps(params), total=total,
+              owner=OWNER_ID, lease_expires_at=_lease())
+    session.add(job)
+    session.commit()
+    session.refresh(job)
+    _pool.submit(_run, job.id)
+    return job
+
+
+def recover_interrupted() -> int:
+    """Fail queued/running jobs whose owner stopped renewing their lease."""
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        res = session.exec(
+            update(Job)
+            .where(
+                Job.status.in_(ACTIVE),
+                Job.owner.is_distinct_from(OWNER_ID),
+                or_(Job.lease_expires_at.is_(None), Job.lease_expires_at < now),
+            )
+            .values(status="failed", error="interrupted: owner process stopped", finished_at=now)
+        )
+        session.commit()
+        return res.rowcount
+
+
+def renew_leases() -> int:
+    """Extend the lease of every active job this process owns."""
+    with Session(engine) as session:
+        res = session.exec(
+            update(Job)
+            .where(Job.status.in_(ACTIVE), Job.owner == OWNER_ID)
+            .values(lease_expires_at=_lease())
+        )
+        session.commit()
+        return res.rowcount
+
+
+def _beat() -> None:
+    while True:
+        try:
+            renew_leases()
+            recover_interrupted()
+        except Exception as e:
+            print(f"❌ Job heartbeat failed: {e}")
+        _time.sleep(max(1, settings.JOB_LEASE_SECONDS / 3))
+
+
+def start_heartbeat() -> None:
+    """Start this process's lease heartbeat (idempotent)."""
+    global _heartbeat
+    with _heartbeat_lock:
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(target=_beat, name="job-heartbeat", daemon=True)
+            _heartbeat.start()
+
+
+def describe(job: Job) -> dict:
+    """Job state with progress, throughput and a naive ETA."""
+    end = job.finished_at or datetime.utcnow()
+    elapsed = (end - job.started_at).total_seconds() if job.started_at else 0.0
+    rate = job.done / elapsed if elapsed > 0 else 0.0
+    left = job.total - job.done
+    return {
+        "id":          job.id,
+        "kind":        job.kind,
+        "status":      job.status,
+        "total":       job.total,
+        "done":        job.done,
+        "progress":    round(job.done / job.total, 4) if job.total else 1.0,
+        "elapsed_s":   round(elapsed, 2),
+        "items_per_s": round(rate, 1),
+        "eta_s":       round(left / rate, 1) if rate and job.status == "running" else None,
+        "error":       job.error,
+        "created_at":  job.created_at,
+        "started_at":  job.started_at,
+        "finished_at": job.finished_at,
+        "owner":       job.owner,
+    }
+
+
+def recent(session: Session, limit: int = 20) -> list[Job]:
+    return session.exec(select(Job).order_by(Job.id.desc()).limit(limit)).all()
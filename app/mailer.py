@@ -5,42 +5,63 @@ import smtplib
 import html2text
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Template, StrictUndefined
 from jinja2.exceptions import UndefinedError
 
 from app.config import settings
+from app.smtp_pool import smtp_pool
+from app.template_cache import template_cache
 
 
-def render_template(text: str, context: dict) -> str:
+def render_template(text: str, context: dict, template_id: int = None) -> str:
     """
     Replace {{placeholders}} using Jinja2 and prospect context.
+    The compiled template comes from the process-wide cache.
     """
     try:
-        template = Template(text, undefined=StrictUndefined)
+        template = template_cache.get(text, template_id)
         return template.render(**context)
     except UndefinedError as e:
         print(f"⚠️ Template rendering error: {e}")
         return text  # fallback
 
 
-def send_email(
+def render_plain_text(html: str, context: dict, template_id: int = None) -> str | None:
+    """
+    Render the cached plain-text template derived from *html*.
+    Returns None when there is none (or it fails) so the caller can fall back
+    to html2text on the rendered HTML.
+    """
+    template = template_cache.get_text(html, template_id)
+    if template is None:
+        return None
+    try:
+        return template.render(**context)
+    except UndefinedError:
+        return None
+
+
+def build_message(
     to_email: str,
     subject: str,
     body: str,
     bcc_email: str = None,
-    context: dict = None
-) -> bool:
+    context: dict = None,
+    template_id: int = None
+) -> MIMEMultipart:
     """
-    Sends multipart/alternative email using SMTP. Renders body via Jinja2 if context is provided.
-    Includes both plain-text and HTML versions.
+    Render subject/body via Jinja2 if context is provided and build the
+    multipart/alternative message with both plain-text and HTML versions.
     """
     # Jinja2 rendering
+    plain_text = None
     if context:
-        subject = render_template(subject, context)
-        body = render_template(body, context)
+        subject = render_template(subject, context, template_id)
+        plain_text = render_plain_text(body, context, template_id)
+        body = render_template(body, context, template_id)
 
-    # Convert HTML body to plain text
-    plain_text = html2text.html2text(body)
+    # Convert HTML body to plain text when no derived template was usable
+    if plain_text is None:
+        plain_text = html2text.html2text(body)
 
     # Build message
     msg = MIMEMultipart("alternative")
@@ -52,14 +73,37 @@ def send_email(
 
     msg.attach(MIMEText(plain_text, "plain"))
     msg.attach(MIMEText(body, "html"))
+    return msg
 
-    try:
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-        return True
-    except Exception as e:
-        print(f"❌ Failed to send email to {to_email}: {e}")
-        return False
 
+def send_email(
+    to_email: str,
+    subject: str,
+    body: str,
+    bcc_email: str = None,
+    context: dict = None,
+    template_id: int = None
+) -> bool:
+    """
+    Sends multipart/alternative email over a pooled SMTP session. Renders body via Jinja2 if context is provided.
+    Includes both plain-text and HTML versions.
+    """
+    msg = build_message(
+        to_email, subject, body,
+        bcc_email=bcc_email, context=context, template_id=template_id,
+    )
+
+    # A pooled session may have been dropped by the server since its last
+    # health check – retry once on a fresh connection before giving up.
+    for attempt in (1, 2):
+        try:
+            with smtp_pool.connection() as server:
+                server.send_message(msg)
+            return True
+        except smtplib.SMTPServerDisconnected as e:
+            if attempt == 2:
+                print(f"❌ Failed to send email to {to_email}: {e}")
+        except Exception as e:
+            print(f"❌ Failed to send email to {to_email}: {e}")
+            return False
+    return False
@@ -1,26 +1,37 @@
 # 📄 app/main.py  – full, updated to cascade deletes and purge orphaned scheduled emails
 
 import os
+import json
 import logging
+import tempfile
 from datetime import datetime, date, time
 from typing import List, Optional
 
 import pytz
-from fastapi import FastAPI, HTTPException, Depends, Request, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
 from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
-from sqlalchemy import func, delete
+from sqlalchemy import func, delete, or_
 
 from app.database import get_session
 # from app.database import init_db    ← no longer needed
 from app.models import (
     Prospect, EmailTemplate, Sequence, SequenceStep,
-    ScheduledEmail, SentEmail,
+    ScheduledEmail, SentEmail, SendRollup, Job,
+)
+from app.schemas import (
+    AssignSequenceRequest, ProspectBulkDelete, ProspectBulkPatch,
+    SequenceCreate, SequenceRead, TestEmailRequest,
 )
-from app.schemas import AssignSequenceRequest, SequenceCreate, SequenceRead, TestEmailRequest
 from app.mailer import send_email
+from app.pipeline import run_pipeline
+from app.planner import PLANNING_MODES
+from app.rate_limit import rate_limiter
 from app.config import settings
-from app import crud
+from app.bulk import chunked
+from app.utils import normalize_email
+from app import analytics, bodies, crud, importer, jobs, pagination, rollups
 from app.routes import open_tracking
 from app.dev import router as dev_router
 
@@ -121,6 +132,34 @@ def cron_log():
         lines = [line.strip() for line in f if "Cron job fired" in line]
     return {"lines": lines[-10:]}
 
+@app.get("/rate-limits")
+def rate_limits(db: Session = Depends(get_session)):
+    """Current token-bucket levels of the send-rate limiter (shared by all processes)."""
+    return {
+        "sender":  settings.SMTP_USER,
+        "buckets": rate_limiter.snapshot(db),
+        "next_send_in_s": round(rate_limiter.wait_time(db, 1, settings.SMTP_USER), 1),
+    }
+
+@app.get("/scheduler/health")
+def scheduler_health():
+    """
+    Heartbeat published by the scheduler daemon, plus whether it is fresh.
+    """
+    path = settings.SCHEDULER_HEARTBEAT_FILE
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Scheduler daemon has not reported yet")
+    with open(path) as f:
+        state = json.load(f)
+    last = datetime.fromisoformat(state["last_beat"]) if state.get("last_beat") else None
+    stale_after = 2 * settings.SCHEDULER_POLL_SECONDS + 30
+    state["alive"] = (
+        state.get("status") != "stopped"
+        and last is not None
+        and (datetime.utcnow() - last).total_seconds() < stale_after
+    )
+    return state
+
 # ────────────── Helpers ──────────────
 def _now() -> datetime:
     return datetime.now(CET)
@@ -147,8 +186,6 @@ def _sent_today(db: Session) -> int:
     )
     return _scalar(db, stmt)
 
-count_sent_today = _sent_today
-
 # ────────────── Scheduler ──────────────
 def _send_pending() -> str:
     with next(get_session()) as db:
@@ -156,64 +193,10 @@ def _send_pending() -> str:
         if not (_is_working(now) and SEND_START <= now.time() <= SEND_END):
             return "outside window"
 
-        sent_today = _sent_today(db)
-        if sent_today >= settings.MAX_EMAILS_PER_DAY:
-            return "daily limit reached"
-
-        pending = db.exec(
-            select(ScheduledEmail).where(
-                ScheduledEmail.send_at <= now,
-                ScheduledEmail.sent_at.is_(None),
-                ScheduledEmail.status == "pending",
-            )
-        ).all()
+        if not rate_limiter.available(db, settings.SMTP_USER):
+            return "rate limit reached"
 
-        processed = 0
-        for sched in pending:
-            if sent_today >= settings.MAX_EMAILS_PER_DAY:
-                break
-
-            prospect = db.get(Prospect, sched.prospect_id)
-            template = db.get(EmailTemplate, sched.template_id)
-            if not (prospect and template):
-                continue
-
-            seq = db.get(Sequence, sched.sequence_id) if sched.sequence_id else None
-            bcc = getattr(seq, "bcc_email", None) or None
-
-            ctx = {
-                "name":    prospect.name,
-                "email":   prospect.email,
-                "company": prospect.company or "",
-                "title":   prospect.title or "",
-            }
-
-            ok = send_email(
-                to_email=prospect.email,
-                subject=template.subject,
-                body=template.body,
-                bcc_email=bcc,
-                context=ctx,
-            )
-
-            sched.sent_at = datetime.utcnow()
-            sched.status  = "sent" if ok else "failed"
-
-            db.add(SentEmail(
-                to=prospect.email,
-                subject=template.subject,
-                body=template.body,
-                sent_at=sched.sent_at,
-                status=sched.status,
-                prospect_id=prospect.id,
-                template_id=template.id,
-                sequence_id=sched.sequence_id,
-            ))
-            processed += int(ok)
-            sent_today += int(ok)
-
-        db.commit()
-        return f"processed {processed}"
+        return f"processed {run_pipeline(now).sent}"
 
 @app.post("/run-scheduler")
 def run_scheduler_api():
@@ -221,102 +204,142 @@ def run_scheduler_api():
 
 @app.post("/force-scheduler")
 def force_scheduler():
-    with next(get_session()) as db:
-        now = datetime.utcnow()
-        pending = db.exec(
-            select(ScheduledEmail).where(
-                ScheduledEmail.sent_at.is_(None),
-                ScheduledEmail.status == "pending",
-                ScheduledEmail.send_at <= now,
-            )
-        ).all()
-
-        processed = 0
-        for sched in pending:
-            prospect = db.get(Prospect, sched.prospect_id)
-            template = db.get(EmailTemplate, sched.template_id)
-            if not (prospect and template):
-                continue
-
-            sequence = db.get(Sequence, prospect.sequence_id) if prospect.sequence_id else None
-            bcc = getattr(sequence, "bcc_email", None) or getattr(settings, "DEFAULT_BCC_EMAIL", "")
-
-            ok = send_email(
-                to_email=prospect.email,
-                subject=template.subject,
-                body=template.body,
-                bcc_email=bcc,
-                context={
-                    "name":    prospect.name,
-                    "email":   prospect.email,
-                    "company": prospect.company or "",
-                    "title":   prospect.title or "",
-                },
-            )
-
-            sched.sent_at = datetime.utcnow()
-            sched.status  = "sent" if ok else "failed"
-
-            db.add(SentEmail(
-                to=prospect.email,
-                subject=template.subject,
-                body=template.body,
-                sent_at=sched.sent_at,
-                status=sched.status,
-                prospect_id=prospect.id,
-                template_id=template.id,
-                sequence_id=prospect.sequence_id,
-            ))
-            processed += int(ok)
-
-        db.commit()
-        return {"message": f"FORCE scheduler sent {processed} overdue emails"}
+    # force ignores the send window and the rate limits
+    processed = run_pipeline(datetime.utcnow(), rate_limited=False).sent
+    return {"message": f"FORCE scheduler sent {processed} overdue emails"}
 
 # ────────────── Prospects CRUD/List ──────────────
+PROSPECT_SORTS = {
+    "id":         Prospect.id,
+    "created_at": Prospect.created_at,
+    "name":       Prospect.name,
+    "email":      Prospect.email,
+}
+
 @app.get("/prospects")
 def list_prospects(
     assigned: Optional[str] = None,
+    q: Optional[str] = None,
+    sort: str = "id",
+    order: str = "asc",
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False,
     db: Session = Depends(get_session),
 ):
+    """
+    Prospects with sequence progress. Without *limit* the full list is
+    returned (legacy); with it, one keyset page as
+    {"items", "next_cursor", "total"} – pass next_cursor back for the next page.
+    *q* searches email, name and company.
+    """
     if assigned is not None:
         assigned = str(assigned).lower() in {"1", "true", "yes", "on"}
+    if sort not in PROSPECT_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(PROSPECT_SORTS)}")
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be 'asc' or 'desc'")
 
-    q = select(Prospect)
+    stmt = select(Prospect)
     if assigned is True:
-        q = q.where(Prospect.sequence_id.is_not(None))
+        stmt = stmt.where(Prospect.sequence_id.is_not(None))
     elif assigned is False:
-        q = q.where(Prospect.sequence_id.is_(None))
-    prospects = db.exec(q).all()
-
-    steps_per_seq = {
-        seq.id: _scalar(
-            db,
-            select(func.count()).select_from(SequenceStep)
-            .where(SequenceStep.sequence_id == seq.id)
+        stmt = stmt.where(Prospect.sequence_id.is_(None))
+    if q:
+        stmt = stmt.where(or_(
+            Prospect.email.icontains(q, autoescape=True),
+            Prospect.name.icontains(q, autoescape=True),
+            Prospect.company.icontains(q, autoescape=True),
+        ))
+
+    keys = [PROSPECT_SORTS[sort]] if sort == "id" else [PROSPECT_SORTS[sort], Prospect.id]
+    if limit is None and cursor is None:
+        order_by = [k.desc() for k in keys] if order == "desc" else keys
+        return _with_progress(db, db.exec(stmt.order_by(*order_by)).all())
+
+    try:
+        rows, next_cursor = pagination.keyset_page(
+            db, stmt, keys, limit or 50, cursor=cursor, descending=order == "desc",
         )
-        for seq in db.exec(select(Sequence)).all()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "items":       _with_progress(db, rows),
+        "next_cursor": next_cursor,
+        "total":       pagination.count(db, stmt) if with_total else None,
     }
 
-    sched_map = {}
-    for s in db.exec(select(ScheduledEmail)).all():
-        sched_map.setdefault(s.prospect_id, []).append(s)
+def _with_progress(db: Session, prospects: list) -> list[dict]:
+    """
+    Prospect dicts plus sequence name, step count and sent/failed count.
+    Progress is looked up for these prospects only (one GROUP BY per id
+    chunk on the schedule's (prospect_id, status) index), not the whole table.
+    """
+    done = {}
+    for ids in chunked([p.id for p in prospects]):
+        done.update(db.exec(
+            select(ScheduledEmail.prospect_id, func.count())
+            .where(ScheduledEmail.prospect_id.in_(ids),
+                   ScheduledEmail.status.in_(("sent", "failed")))
+            .group_by(ScheduledEmail.prospect_id)
+        ).all())
+    seq_ids = list({p.sequence_id for p in prospects if p.sequence_id})
+    names, steps = {}, {}
+    for ids in chunked(seq_ids):
+        names.update(db.exec(select(Sequence.id, Sequence.name).where(Sequence.id.in_(ids))).all())
+        steps.update(db.exec(
+            select(SequenceStep.sequence_id, func.count())
+            .where(SequenceStep.sequence_id.in_(ids))
+            .group_by(SequenceStep.sequence_id)
+        ).all())
+    return [
+        _progress_row(p, names.get(p.sequence_id), steps.get(p.sequence_id, 0), done.get(p.id, 0))
+        for p in prospects
+    ]
+
+def _progress_row(p: Prospect, sequence_name, total: int, done: int) -> dict:
+    return {
+        **p.dict(),
+        "sequence_name":         sequence_name,
+        "sequence_steps_total":  total,
+        "sequence_step_current": done,
+        "sequence_progress_pct": int(100 * done / total) if total else 0,
+    }
 
-    out = []
-    for p in prospects:
-        total = steps_per_seq.get(p.sequence_id, 0)
-        done  = sum(1 for s in sched_map.get(p.id, []) if s.status in {"sent", "failed"})
-        out.append({
-            **p.dict(),
-            "sequence_name":        db.get(Sequence, p.sequence_id).name if p.sequence_id else None,
-            "sequence_steps_total": total,
-            "sequence_step_current": done,
-            "sequence_progress_pct": int(100 * done / total) if total else 0,
-        })
-    return out
+@app.post("/prospects/import")
+async def import_prospects(request: Request, format: Optional[str] = None):
+    """
+    Bulk import from a CSV (header: name,email,title,company) or NDJSON body –
+    either raw (Content-Type text/csv / application/x-ndjson) or as a
+    multipart "file" field. The body is spooled to a temp file and parsed
+    row by row in a worker thread.
+    """
+    ctype = request.headers.get("content-type", "")
+    if ctype.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or not hasattr(upload, "file"):
+            raise HTTPException(status_code=400, detail="multipart upload needs a 'file' field")
+        fobj, fmt = upload.file, format or importer.detect_format(upload.content_type, upload.filename)
+    else:
+        fobj = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        async for chunk in request.stream():
+            fobj.write(chunk)
+        fobj.seek(0)
+        fmt = format or importer.detect_format(ctype)
+    if fmt not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+    try:
+        return await run_in_threadpool(importer.import_prospects, fobj, fmt)
+    finally:
+        fobj.close()
 
 @app.post("/prospects")
 def add_prospect(p: Prospect, db: Session = Depends(get_session)):
-    return crud.create_prospect(db, p)
+    created = crud.create_prospect(db, p)
+    if created is None:
+        raise HTTPException(status_code=409, detail="A prospect with this email already exists")
+    return created
 
 @app.put("/prospects/{pid}")
 def edit_prospect(pid: int, data: Prospect, db: Session = Depends(get_session)):
@@ -325,6 +348,11 @@ def edit_prospect(pid: int, data: Prospect, db: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Prospect not found")
 
     updates = data.dict(exclude_unset=True)
+    if "email" in updates:
+        updates["email"] = normalize_email(updates["email"])
+        other = crud.get_prospect_by_email(db, updates["email"])
+        if other and other.id != pid:
+            raise HTTPException(status_code=409, detail="Another prospect has this email")
     # If user cleared sequence_id, purge any pending scheduled emails for that prospect
     if "sequence_id" in updates and updates["sequence_id"] is None:
         db.exec(delete(ScheduledEmail).where(ScheduledEmail.prospect_id == pid))
@@ -343,19 +371,77 @@ def delete_prospect(pid: int, db: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Prospect not found")
     return {"message": "deleted"}
 
+@app.post("/prospects/bulk-delete")
+def bulk_delete_prospects(payload: ProspectBulkDelete, db: Session = Depends(get_session)):
+    """Delete many prospects (and their emails) in one transaction."""
+    results = crud.bulk_delete_prospects(db, payload.ids)
+    db.commit()
+    return {
+        "deleted": sum(1 for r in results.values() if r == "deleted"),
+        "results": [{"id": pid, "status": r} for pid, r in results.items()],
+    }
+
+@app.patch("/prospects/bulk")
+def bulk_patch_prospects(payload: ProspectBulkPatch, db: Session = Depends(get_session)):
+    """Partial updates for many prospects in one transaction; unchanged rows are not written."""
+    results = crud.bulk_patch_prospects(db, [i.dict(exclude_unset=True) for i in payload.items])
+    db.commit()
+    return {
+        "updated": sum(1 for r in results.values() if r == "updated"),
+        "results": [{"id": pid, "status": r} for pid, r in results.items()],
+    }
+
 # ────────────── Assign Sequence / Bulk Scheduling ──────────────
 @app.post("/assign-sequence")
 def assign_sequence(payload: AssignSequenceRequest, db: Session = Depends(get_session)):
     start = date.today()
     if payload.start_date:
         start = datetime.strptime(payload.start_date, "%Y-%m-%d").date()
-    crud.bulk_assign_sequence_to_prospects(
-        db, payload.prospect_ids, payload.sequence_id,
-        ventilate_days=payload.ventilate_days or 0,
-        start_date=start
-    )
+    planning = payload.planning or "random"
+    if planning not in PLANNING_MODES:
+        raise HTTPException(status_code=400, detail=f"planning must be one of {', '.join(PLANNING_MODES)}")
+    try:
+        crud.bulk_assign_sequence_to_prospects(
+            db, payload.prospect_ids, payload.sequence_id,
+            ventilate_days=payload.ventilate_days or 0,
+            start_date=start,
+            planning=planning,
+        )
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
     return {"message": "sequence assigned"}
 
+# ────────────── Background Jobs ──────────────
+@app.on_event("startup")
+def _recover_jobs():
+    jobs.start_heartbeat()  # also fails jobs of processes that are gone
+
+@app.post("/jobs/assign-sequence", status_code=status.HTTP_202_ACCEPTED)
+def assign_sequence_job(payload: AssignSequenceRequest, db: Session = Depends(get_session)):
+    """Queue a (large) sequence assignment; poll GET /jobs/{id} for progress."""
+    planning = payload.planning or "random"
+    if planning not in PLANNING_MODES:
+        raise HTTPException(status_code=400, detail=f"planning must be one of {', '.join(PLANNING_MODES)}")
+    if payload.start_date:
+        try:
+            date.fromisoformat(payload.start_date)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="start_date must be YYYY-MM-DD")
+    job = jobs.submit(db, "assign_sequence", payload.dict(), total=len(payload.prospect_ids))
+    return jobs.describe(job)
+
+@app.get("/jobs")
+def list_jobs(db: Session = Depends(get_session)):
+    return [jobs.describe(j) for j in jobs.recent(db)]
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_session)):
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.describe(job)
+
 # ────────────── Sequence CRUD & Steps ──────────────
 @app.get("/sequences", response_model=List[SequenceRead])
 def list_sequences(db: Session = Depends(get_session)):
@@ -445,43 +531,115 @@ def delete_template(tid: int, db: Session = Depends(get_session)):
     return {"message": "deleted"}
 
 # ────────────── Sent Emails & Analytics ──────────────
-@app.get("/sent-emails")
-def list_sent(db: Session = Depends(get_session)):
-    sent = db.exec(select(SentEmail).order_by(SentEmail.sent_at.desc())).all()
-    tnames = {t.id: t.name for t in db.exec(select(EmailTemplate)).all()}
-    snames = {s.id: s.name for s in db.exec(select(Sequence)).all()}
-    enriched = []
-    for e in sent:
-        enriched.append({
-            **e.dict(),
-            "template_name": tnames.get(e.template_id),
-            "sequence_name": snames.get(e.sequence_id),
-        })
-    return enriched
+SENT_FIELDS = {
+    "id":            SentEmail.id,
+    "to":            SentEmail.to,
+    "subject":       SentEmail.subject,
+    "body":          SentEmail.body_hash.label("body"),  # decompressed in _sent_rows
+    "sent_at":       SentEmail.sent_at,
+    "status":        SentEmail.status,
+    "prospect_id":   SentEmail.prospect_id,
+    "template_id":   SentEmail.template_id,
+    "template_name": EmailTemplate.name.label("template_name"),
+    "sequence_id":   SentEmail.sequence_id,
+    "sequence_name": Sequence.name.label("sequence_name"),
+}
+SENT_DEFAULT_FIELDS = [f for f in SENT_FIELDS if f != "body"]
+
+def _sent_select(fields: List[str]):
+    """SELECT of just *fields* (id and sent_at always, for the cursor); names joined only if asked."""
+    fields = list(dict.fromkeys(["id", "sent_at", *fields]))
+    stmt = select(*(SENT_FIELDS[f] for f in fields)).select_from(SentEmail)
+    if "template_name" in fields:
+        stmt = stmt.outerjoin(EmailTemplate, EmailTemplate.id == SentEmail.template_id)
+    if "sequence_name" in fields:
+        stmt = stmt.outerjoin(Sequence, Sequence.id == SentEmail.sequence_id)
+    return stmt
+
+def _sent_rows(db: Session, rows) -> List[dict]:
+    """Rows as dicts; a selected body (stored by hash) is loaded from the body store."""
+    out = [dict(r._mapping) for r in rows]
+    if out and "body" in out[0]:
+        texts = bodies.load_many(db, (r["body"] for r in out))
+        for r in out:
+            r["body"] = texts.get(r["body"])
+    return out
 
-@app.get("/analytics/summary")
-def analytics(db: Session = Depends(get_session)):
-    all_sent = db.exec(select(SentEmail)).all()
-    failed   = sum(1 for e in all_sent if e.status == "failed")
-    opened   = sum(1 for e in all_sent if e.status == "opened")
+@app.get("/sent-emails")
+def list_sent(
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    sequence_id: Optional[int] = None,
+    template_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=pagination.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    db: Session = Depends(get_session),
+):
+    """
+    Sent emails, newest first. *fields* is a comma-separated projection
+    (default: everything but body – use /sent-emails/{id} for content);
+    *status* may list several values. Without *limit* all matching rows are
+    returned as a list; with it, one page as {"items", "next_cursor", "total"}.
+    """
+    picked = [f.strip() for f in fields.split(",") if f.strip()] if fields else SENT_DEFAULT_FIELDS
+    unknown = [f for f in picked if f not in SENT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"unknown fields: {', '.join(unknown)}")
+
+    stmt = _sent_select(picked)
+    if status:
+        stmt = stmt.where(SentEmail.status.in_([s.strip() for s in status.split(",")]))
+    if sequence_id is not None:
+        stmt = stmt.where(SentEmail.sequence_id == sequence_id)
+    if template_id is not None:
+        stmt = stmt.where(SentEmail.template_id == template_id)
+    if since:
+        stmt = stmt.where(SentEmail.sent_at >= since)
+    if until:
+        stmt = stmt.where(SentEmail.sent_at < until)
+
+    keys = [SentEmail.sent_at, SentEmail.id]
+    if limit is None and cursor is None:
+        rows = db.exec(stmt.order_by(*(k.desc() for k in keys))).all()
+        return _sent_rows(db, rows)
+    try:
+        rows, next_cursor = pagination.keyset_page(db, stmt, keys, limit or 50, cursor=cursor, descending=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return {
-        "total_sent":   len(all_sent),
-        "total_failed": failed,
-        "open_rate":    round(opened / len(all_sent) * 100, 2) if all_sent else 0,
-        "sent_today":   _sent_today(db),
-        "recent": [
-            {
-                "to":            e.to,
-                "subject":       e.subject,
-                "status":        e.status,
-                "sent_at":       e.sent_at,
-                "template_name": getattr(e, 'template_name', None),
-                "sequence_name": getattr(e, 'sequence_name', None),
-            }
-            for e in all_sent[:10]
-        ]
+        "items":       _sent_rows(db, rows),
+        "next_cursor": next_cursor,
+        "total":       pagination.count(db, stmt) if with_total else None,
     }
 
+@app.get("/sent-emails/{sid}")
+def get_sent(sid: int, db: Session = Depends(get_session)):
+    """One sent email with its full body."""
+    row = db.exec(_sent_select(list(SENT_FIELDS)).where(SentEmail.id == sid)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Sent email not found")
+    out = dict(row._mapping)
+    out["body"] = bodies.load(db, out["body"])
+    return out
+
+@app.get("/analytics/summary")
+def analytics_summary(db: Session = Depends(get_session)):
+    """Dashboard totals + recent sends; cached until the send history changes (or ANALYTICS_CACHE_SECONDS)."""
+    return analytics.summary_cache.get(
+        lambda: analytics.summary(db, sent_today=_sent_today(db)),
+        version=analytics.version(db),
+    )
+
+@app.get("/analytics/volume")
+def analytics_volume(by: str = "sequence", since: Optional[date] = None, db: Session = Depends(get_session)):
+    """Send counts per sequence, template or day (from the SendRollup counters)."""
+    if by not in rollups.VOLUME_BY:
+        raise HTTPException(status_code=400, detail=f"by must be one of {', '.join(rollups.VOLUME_BY)}")
+    return rollups.volume(db, by, since)
+
 @app.post("/send-test")
 def send_test_email(data: TestEmailRequest):
     context = {
@@ -548,7 +706,7 @@ def unsubscribe(token: str, db: Session = Depends(get_session)):
     from app.tracking import serializer
     try:
         email    = serializer.loads(token)
-        prospect = db.exec(select(Prospect).where(Prospect.email == email)).first()
+        prospect = crud.get_prospect_by_email(db, email)
         if prospect:
             prospect.unsubscribed = True
             db.add(prospect)
@@ -561,9 +719,10 @@ def unsubscribe(token: str, db: Session = Depends(get_session)):
 def reset_all(db: Session = Depends(get_session)):
     if os.getenv("DEV_MODE", "false").lower() != "true":
         raise HTTPException(status_code=403, detail="Not allowed in production")
-    for model in (SentEmail, ScheduledEmail, SequenceStep, Sequence, Prospect, EmailTemplate):
+    # one transaction, so the rollup counters never outlive the sends they count
+    for model in (SendRollup, SentEmail, ScheduledEmail, SequenceStep, Sequence, Prospect, EmailTemplate):
         db.query(model).delete()
-        db.commit()
+    db.commit()
     return {"message": "all data deleted"}
 
 # ────────────── CLI Entrypoint ──────────────
@@ -4,13 +4,20 @@
 
 from typing import Optional
 from sqlmodel import SQLModel, Field
-from datetime import datetime
+from sqlalchemy import Index
+from datetime import date, datetime
 
 class Prospect(SQLModel, table=True):
+    # keyset pagination sorts by (name, id) / (created_at, id): one range scan each
+    __table_args__ = (
+        Index("ix_prospect_name_id", "name", "id"),
+        Index("ix_prospect_created_at_id", "created_at", "id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: Optional[str] = None
     name: str
-    email: str
+    email: str = Field(index=True, unique=True)  # normalized, see utils.normalize_email
     company: Optional[str] = None
     sequence_id: Optional[int] = Field(default=None, foreign_key="sequence.id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -36,25 +43,65 @@ class SequenceStep(SQLModel, table=True):
     delay_days: int
     
 class ScheduledEmail(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_scheduledemail_status_send_at", "status", "send_at"),
+        Index("ix_scheduledemail_prospect_id_status", "prospect_id", "status"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     prospect_id: int = Field(foreign_key="prospect.id")
     template_id: int = Field(foreign_key="emailtemplate.id")
     sequence_id: Optional[int] = Field(default=None, foreign_key="sequence.id")  # ✅ Add this line
     send_at: datetime
     sent_at: Optional[datetime] = None
-    status: str = "pending"
+    status: str = "pending"  # pending, claimed, sent, failed
+    claimed_by: Optional[str] = Field(default=None, index=True)  # worker claim token
+    claim_expires_at: Optional[datetime] = None  # lease; expired claims return to the queue
+
+class SendRollup(SQLModel, table=True):
+    """Sent email counters per UTC day × sequence × template × status (see app/rollups.py)."""
+    day: date = Field(primary_key=True)
+    sequence_id: int = Field(default=0, primary_key=True)  # 0 = no sequence
+    template_id: int = Field(default=0, primary_key=True)  # 0 = no template
+    status: str = Field(primary_key=True)                   # sent, failed, opened
+    total: int = 0
+
+class EmailBody(SQLModel, table=True):
+    """A sent body stored once per distinct content (see app/bodies.py)."""
+    hash: str = Field(primary_key=True)  # sha256 hex of the UTF-8 body
+    data: bytes                          # zlib-compressed body
+    size: int                            # uncompressed bytes
 
 class SentEmail(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     to: str
     subject: str
-    body: str
-    sent_at: datetime
+    body_hash: Optional[str] = Field(default=None, foreign_key="emailbody.hash")
+    sent_at: datetime = Field(index=True)
     status: str  # sent, failed, opened, bounced
     prospect_id: Optional[int] = Field(default=None, foreign_key="prospect.id")
     template_id: Optional[int] = Field(default=None, foreign_key="emailtemplate.id")  # <-- ADD THIS
     sequence_id: Optional[int] = Field(default=None, foreign_key="sequence.id")      # <-- OPTIONAL: if you need sequence info
 
+class RateLimitState(SQLModel, table=True):
+    key: str = Field(primary_key=True)  # "global:hour", "sender:<account>:minute", …
+    tokens: float
+    updated_at: datetime
+
+class Job(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str                       # e.g. "assign_sequence"
+    status: str = "queued"          # queued, running, done, failed
+    params: str = "{}"              # JSON payload
+    total: int = 0
+    done: int = 0
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    owner: Optional[str] = None     # jobs.OWNER_ID of the process running it
+    lease_expires_at: Optional[datetime] = None  # renewed by the owner's heartbeat
+
 class EmailTemplateCreate(SQLModel):
     name: str
     subject: str
@@ -0,0 +1,70 @@
+# email-platform/app/pagination.py
+# 📄 Keyset (cursor) pagination for list endpoints
+#
+# A page is "rows after the last row seen" in (sort key, id) order, so each
+# page is one indexed range scan + LIMIT whatever page you are on – no OFFSET.
+# The cursor is the last row's key values, JSON + base64url encoded.
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import DateTime, func, tuple_
+from sqlalchemy.engine import Row
+from sqlmodel import Session, select
+
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list:
+    """Cursor back to key values; raises ValueError if it is not one of ours."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("invalid cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise ValueError("invalid cursor")
+    return [
+        datetime.fromisoformat(v) if isinstance(k.type, DateTime) and v is not None else v
+        for k, v in zip(keys, values)
+    ]
+
+
+def keyset_page(
+    session: Session,
+    stmt,
+    keys: Sequence,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = False,
+) -> tuple[list, Optional[str]]:
+    """
+    One page of *stmt* ordered by *keys* (non-null columns, the last one
+    unique – usually the id). Rows may be entities, tuples whose first
+    element is the entity, or column rows that include the key columns.
+    Returns (rows, next cursor or None).
+    """
+    if cursor:
+        last = tuple_(*decode_cursor(cursor, keys))
+        stmt = stmt.where(tuple_(*keys) < last if descending else tuple_(*keys) > last)
+    order = [k.desc() for k in keys] if descending else list(keys)
+    rows = session.exec(stmt.order_by(*order).limit(limit + 1)).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, Row) and hasattr(last[0], "__table__"):
+        last = last[0]
+    return rows, encode_cursor([getattr(last, k.key) for k in keys])
+
+
+def count(session: Session, stmt) -> int:
+    """Total rows *stmt* would return (for "N matching" displays)."""
+    return session.exec(select(func.count()).select_from(stmt.order_by(None).subquery())).one()
@@ -0,0 +1,426 @@
+# email-platform/app/pipeline.py
+# 📄 Staged send pipeline shared by every send entry point
+#
+#   claim → load → render → send → record
+#
+# Each stage runs in its own thread (render: PIPELINE_RENDER_WORKERS threads,
+# send: one asyncio loop multiplexing SMTP connections) and hands work on
+# through a bounded queue, so rendering overlaps with network I/O and DB
+# writes. Every stage counts items, busy time, time starved for input and
+# time blocked on the next stage, plus its input queue's high-water mark.
+
+import asyncio
+import queue
+import threading
+import time as _time
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import Session
+from sqlalchemy import insert, update
+
+from app import bodies, rollups
+from app.async_mailer import AsyncDispatcher
+from app.config import settings
+from app.database import engine
+from app.mailer import build_message
+from app.models import ScheduledEmail, SentEmail
+from app.rate_limit import rate_limiter
+from app.send_queue import iter_claimed, load_send_context, release_claims
+
+_DONE = object()  # end-of-stream marker passed down the queues
+
+STAGES = ("claim", "load", "render", "send", "record")
+
+last_report: Optional[dict] = None  # report() of the most recent run in this process
+
+
+class SendRecorder:
+    """
+    Buffers send results and writes them in micro-batches: one executemany
+    UPDATE of the ScheduledEmail rows, one multi-row INSERT of SentEmail rows
+    (bodies not yet seen go to the EmailBody store first, counts to the
+    SendRollup counters) and a commit every SEND_COMMIT_EVERY results or
+    SEND_COMMIT_SECONDS, whichever comes first. A crash therefore re-sends
+    at most one unflushed micro-batch (its rows are still claimed and return
+    after the lease), and the session never accumulates dirty objects.
+    """
+
+    def __init__(self, session, every: int = None, seconds: float = None):
+        self.session = session
+        self.every = max(1, every or settings.SEND_COMMIT_EVERY)
+        self.seconds = seconds if seconds is not None else settings.SEND_COMMIT_SECONDS
+        self.processed = 0
+        self.sent = 0
+        self.finished = 0  # rows done with: sent, failed or skipped
+        self._updates: list[dict] = []
+        self._records: list[dict] = []
+        self._hashes: dict = {}       # template body -> EmailBody hash
+        self._new_bodies: list = []   # bodies to store before the next INSERT
+        self._last = _time.monotonic()
+
+    def add(self, sched, prospect, template, ok: bool, sequence_id=None) -> None:
+        sent_at = datetime.utcnow()
+        status = "sent" if ok else "failed"
+        self._updates.append({"id": sched.id, "sent_at": sent_at, "status": status,
+                              "claim_expires_at": None})
+        h = self._hashes.get(template.body)
+        if h is None:
+            h = self._hashes[template.body] = bodies.body_hash(template.body)
+            self._new_bodies.append(template.body)
+        self._records.append({
+            "to": prospect.email,
+            "subject": template.subject,
+            "body_hash": h,
+            "sent_at": sent_at,
+            "status": status,
+            "prospect_id": prospect.id,
+            "template_id": template.id,
+            "sequence_id": sequence_id,
+        })
+        self.processed += 1
+        self.finished += 1
+        self.sent += int(ok)
+        self.tick()
+
+    def skip(self, sched) -> None:
+        """Orphaned row (prospect/template gone) – it can never be sent."""
+        self._updates.append({"id": sched.id, "sent_at": None, "status": "failed",
+                              "claim_expires_at": None})
+        self.finished += 1
+        self.tick()
+
+    def tick(self) -> None:
+        """Flush if the micro-batch is full or old enough."""
+        if (len(self._updates) >= self.every
+                or (self._updates and _time.monotonic() - self._last >= self.seconds)):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._updates:
+            self.session.execute(update(ScheduledEmail), self._updates)
+        if self._new_bodies:
+            bodies.store(self.session, self._new_bodies)
+            self._new_bodies = []
+        if self._records:
+            self.session.execute(insert(SentEmail), self._records)
+            rollups.record(self.session, self._records)
+        self.session.commit()
+        self._updates, self._records = [], []
+        self._last = _time.monotonic()
+
+    def __enter__(self) -> "SendRecorder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        # results that were actually sent are written even if the loop failed
+        self.flush()
+
+
+class StageStats:
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0      # doing work (send: summed per-message latency)
+        self.starved = 0.0   # waiting for input
+        self.blocked = 0.0   # waiting for room in the next stage's queue
+        self.max_queue = 0   # input queue high-water mark
+        self._lock = threading.Lock()
+
+    def add(self, items: int = 0, busy: float = 0.0) -> None:
+        with self._lock:
+            self.items += items
+            self.busy += busy
+
+    def as_dict(self) -> dict:
+        return {
+            "items":     self.items,
+            "busy_s":    round(self.busy, 3),
+            "starved_s": round(self.starved, 3),
+            "blocked_s": round(self.blocked, 3),
+            "max_queue": self.max_queue,
+        }
+
+
+class _Send:
+    __slots__ = ("sched", "prospect", "template", "sequence_id", "job", "msg")
+
+    def __init__(self, sched, prospect, template, sequence_id, job):
+        self.sched, self.prospect, self.template = sched, prospect, template
+        self.sequence_id, self.job, self.msg = sequence_id, job, None
+
+
+def build_job(sched, prospect, template, sequences) -> tuple[dict, Optional[int]]:
+    """
+    send_email kwargs for one scheduled email, and the sequence_id to record.
+    The sequence is the schedule's, else the prospect's current one; BCC is
+    the sequence's bcc_email, else SMTP_BCC.
+    """
+    sequence_id = sched.sequence_id or prospect.sequence_id
+    sequence = sequences.get(sequence_id)
+    return {
+        "to_email":    prospect.email,
+        "subject":     template.subject,
+        "body":        template.body,
+        "template_id": template.id,
+        "bcc_email":   getattr(sequence, "bcc_email", None) or settings.SMTP_BCC or None,
+        "context": {
+            "name":    prospect.name,
+            "email":   prospect.email,
+            "company": prospect.company or "",
+            "title":   prospect.title or "",
+        },
+    }, sequence_id
+
+
+class SendPipeline:
+    """
+    One send run over the due queue. *limit* / *ids* / *rate_limited* are
+    passed to the claim stage (send_queue.iter_claimed); run() blocks until
+    every claimed row is recorded and returns the pipeline.
+    """
+
+    def __init__(self, now: datetime, limit: int | None = None,
+                 ids: list[int] | None = None, rate_limited: bool = True):
+        self.now = now
+        self.limit = limit
+        self.ids = ids
+        self.rate_limited = rate_limited
+        self.sender = settings.SMTP_USER  # whose rate-limit buckets tokens come from
+        self.render_workers = max(1, settings.PIPELINE_RENDER_WORKERS)
+
+        size = settings.PIPELINE_QUEUE_SIZE
+        self.queues = {
+            "load":   queue.Queue(maxsize=2),      # claimed rounds
+            "render": queue.Queue(maxsize=size),
+            "send":   queue.Queue(maxsize=size),
+            "record": queue.Queue(),               # never blocks the event loop
+        }
+        self.stats = {name: StageStats(name) for name in STAGES}
+        self.processed = 0
+        self.sent = 0
+        self.elapsed = 0.0
+
+        self._abort = threading.Event()
+        self._errors: list[BaseException] = []
+        self._claimed: set[int] = set()     # ScheduledEmail ids claimed by this run
+        self._dispatched: set[int] = set()  # … of which handed to SMTP
+        self._renderers_left = self.render_workers
+        self._lock = threading.Lock()
+
+    # ────────────── queue helpers ──────────────
+    def _get(self, stage: str):
+        q, st = self.queues[stage], self.stats[stage]
+        st.max_queue = max(st.max_queue, q.qsize())
+        t0 = _time.perf_counter()
+        item = q.get()
+        st.starved += _time.perf_counter() - t0
+        return item
+
+    def _put(self, stage: str, item, sender: str) -> bool:
+        """Hand *item* to *stage*; gives up (False) once the run is aborted."""
+        t0 = _time.perf_counter()
+        try:
+            while True:
+                try:
+                    self.queues[stage].put(item, timeout=0.2)
+                    return True
+                except queue.Full:
+                    if self._abort.is_set():
+                        return False
+        finally:
+            self.stats[sender].blocked += _time.perf_counter() - t0
+
+    def _stage(self, fn, name: str) -> threading.Thread:
+        def _run():
+            try:
+                fn()
+            except BaseException as e:
+                print(f"❌ Send pipeline stage '{name}' failed: {e}")
+                self._errors.append(e)
+                self._abort.set()
+        return threading.Thread(target=_run, name=f"send-{name}", daemon=True)
+
+    # ────────────── stages ──────────────
+    def _claim(self) -> None:
+        st = self.stats["claim"]
+        limiter = rate_limiter if self.rate_limited else None
+        try:
+            with Session(engine) as session:
+                rounds = iter_claimed(session, self.now, limit=self.limit, ids=self.ids,
+                                      limiter=limiter, sender=self.sender)
+                while not self._abort.is_set():
+                    t0 = _time.perf_counter()
+                    claimed = next(rounds, None)
+                    if claimed is None:
+                        break
+                    session.expunge_all()
+                    self._claimed.update(e.id for e in claimed)
+                    st.add(len(claimed), _time.perf_counter() - t0)
+                    if not self._put("load", claimed, "claim"):
+                        break
+        finally:
+            self._put("load", _DONE, "claim")
+
+    def _load(self) -> None:
+        st = self.stats["load"]
+        try:
+            with Session(engine) as session:
+                while (claimed := self._get("load")) is not _DONE:
+                    if self._abort.is_set():
+                        continue
+                    t0 = _time.perf_counter()
+                    prospects, templates, sequences = load_send_context(session, claimed)
+                    session.expunge_all()
+                    sends = []
+                    for sched in claimed:
+                        prospect = prospects.get(sched.prospect_id)
+                        template = templates.get(sched.template_id)
+                        if not (prospect and template):
+                            self._put("record", (_Send(sched, None, None, None, None), None), "load")
+                            continue
+                        job, sequence_id = build_job(sched, prospect, template, sequences)
+                        sends.append(_Send(sched, prospect, template, sequence_id, job))
+                    st.add(len(claimed), _time.perf_counter() - t0)
+                    for item in sends:
+                        if not self._put("render", item, "load"):
+                            break
+        finally:
+            for _ in range(self.render_workers):
+                self._put("render", _DONE, "load")
+
+    def _render(self) -> None:
+        st = self.stats["render"]
+        try:
+            while (item := self._get("render")) is not _DONE:
+                if self._abort.is_set():
+                    continue
+                t0 = _time.perf_counter()
+                try:
+                    item.msg = build_message(**item.job)
+                except Exception as e:
+                    print(f"❌ Failed to render email to {item.job['to_email']}: {e}")
+                    st.add(1, _time.perf_counter() - t0)
+                    self._put("record", (item, False), "render")
+                    continue
+                st.add(1, _time.perf_counter() - t0)
+                self._put("send", item, "render")
+        finally:
+            with self._lock:
+                self._renderers_left -= 1
+                last = self._renderers_left == 0
+            if last:
+                self._put("send", _DONE, "render")
+
+    def _send(self) -> None:
+        st = self.stats["send"]
+
+        async def _one(dispatcher, item):
+            self._dispatched.add(item.sched.id)
+            t0 = _time.perf_counter()
+            ok = await dispatcher.send_message(item.msg)
+            st.add(1, _time.perf_counter() - t0)
+            item.msg = None
+            self._put("record", (item, ok), "send")
+
+        async def _run():
+            dispatcher = AsyncDispatcher()
+            inflight = set()
+            try:
+                while True:
+                    if len(inflight) >= dispatcher.concurrency:
+                        _, inflight = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+                    item = await asyncio.to_thread(self._get, "send")
+                    if item is _DONE:
+                        break
+                    if not self._abort.is_set():
+                        inflight.add(asyncio.create_task(_one(dispatcher, item)))
+                if inflight:
+                    await asyncio.wait(inflight)
+            finally:
+                await dispatcher.close()
+
+        try:
+            asyncio.run(_run())
+        finally:
+            self._put("record", _DONE, "send")
+
+    def _record(self) -> None:
+        st = self.stats["record"]
+        with Session(engine) as session, SendRecorder(session) as recorder:
+            q = self.queues["record"]
+            while True:
+                st.max_queue = max(st.max_queue, q.qsize())
+                t0 = _time.perf_counter()
+                try:
+                    entry = q.get(timeout=max(0.05, recorder.seconds))
+                except queue.Empty:
+                    entry = None
+                st.starved += _time.perf_counter() - t0
+                if entry is None:
+                    recorder.tick()  # time-based checkpoint while idle
+                    continue
+                if entry is _DONE:
+                    break
+                item, ok = entry
+                t0 = _time.perf_counter()
+                if ok is None:
+                    recorder.skip(item.sched)
+                else:
+                    recorder.add(item.sched, item.prospect, item.template, ok, item.sequence_id)
+                st.add(1, _time.perf_counter() - t0)
+                self.processed, self.sent = recorder.processed, recorder.sent
+            if self.rate_limited:
+                # only successful sends count against the quota: give back the
+                # tokens taken for rows that failed or could not be sent
+                rate_limiter.release(session, recorder.finished - recorder.sent, sender=self.sender)
+
+    # ────────────── run ──────────────
+    def run(self) -> "SendPipeline":
+        t0 = _time.perf_counter()
+        threads = [
+            self._stage(self._claim, "claim"),
+            self._stage(self._load, "load"),
+            *[self._stage(self._render, "render") for _ in range(self.render_workers)],
+            self._stage(self._send, "send"),
+            self._stage(self._record, "record"),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.elapsed = _time.perf_counter() - t0
+        global last_report
+        last_report = self.report()
+        if self._errors:
+            self._release_unsent()
+            raise self._errors[0]
+        return self
+
+    def _release_unsent(self) -> None:
+        """After an abort, hand rows that never reached SMTP back to the queue now."""
+        ids = self._claimed - self._dispatched
+        if not ids:
+            return
+        try:
+            with Session(engine) as session:
+                released = release_claims(session, ids)
+                if self.rate_limited:
+                    rate_limiter.release(session, released, sender=self.sender)
+            print(f"↩️ Released {released} unsent claimed emails after the aborted run")
+        except Exception as e:  # they still come back when the lease expires
+            print(f"❌ Could not release unsent claims: {e}")
+
+    def report(self) -> dict:
+        return {
+            "processed": self.processed,
+            "sent":      self.sent,
+            "elapsed_s": round(self.elapsed, 3),
+            "stages":    {name: st.as_dict() for name, st in self.stats.items()},
+        }
+
+
+def run_pipeline(now: datetime, limit: int | None = None, ids: list[int] | None = None,
+                 rate_limited: bool = True) -> SendPipeline:
+    """Send everything due at *now* (see SendPipeline) and return the finished run."""
+    return SendPipeline(now, limit=limit, ids=ids, rate_limited=rate_limited).run()
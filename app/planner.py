@@ -0,0 +1,141 @@
+# email-platform/app/planner.py
+# 📄 Vectorized send-time planning for bulk sequence assignment
+#
+# Computes the send_at of every (prospect, step) pair in one pass with NumPy:
+# first-day offsets, step delays, weekend roll-forward, a random minute inside
+# the sending window and the "not in the past" guard. First days are either
+# random (ventilation) or fitted to each day's remaining capacity.
+
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+WINDOW_START_H = 9
+WINDOW_END_H = 21
+PLANNING_MODES = ("random", "greedy", "proportional")
+
+
+def plan_send_times(
+    n_prospects: int,
+    delays: Sequence[int],
+    start_date: date,
+    ventilate_days: int = 0,
+    start_h: int = WINDOW_START_H,
+    end_h: int = WINDOW_END_H,
+    now: Optional[datetime] = None,
+    seed: Optional[int] = None,
+    first_days: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Return an (n_prospects, len(delays)) datetime64[s] matrix of send times.
+
+    Row i is prospect i: its first day is *first_days[i]* if given, else
+    start_date plus a random offset in [0, ventilate_days); step j adds
+    delays[j] days, Sat/Sun roll forward to Monday and the time is a random
+    minute in [start_h, end_h). Times earlier than *now* on today's date move
+    to now + 30 minutes. The same *seed* gives the same plan.
+    """
+    rng = np.random.default_rng(seed)
+    now = np.datetime64(now or datetime.now(), "s")
+
+    if first_days is None:
+        if ventilate_days:
+            offsets = rng.integers(0, ventilate_days, size=n_prospects)
+        else:
+            offsets = np.zeros(n_prospects, dtype=np.int64)
+        first_days = np.datetime64(start_date, "D") + offsets
+    days = step_days(first_days, delays)
+
+    minutes = rng.integers(0, (end_h - start_h) * 60, size=days.shape)
+    times = (
+        days.astype("datetime64[s]")
+        + np.timedelta64(start_h * 3600, "s")
+        + minutes.astype("timedelta64[m]")
+    )
+
+    past = (days == now.astype("datetime64[D]")) & (times < now)
+    times[past] = now + np.timedelta64(30, "m")
+    return times
+
+
+def step_days(first_days, delays: Sequence[int]) -> np.ndarray:
+    """Send day of every step for every first day (Sat/Sun → Monday)."""
+    first_days = np.asarray(first_days, dtype="datetime64[D]")
+    delays = np.asarray(delays, dtype=np.int64)
+    return np.busday_offset(first_days[..., None] + delays, 0, roll="forward")
+
+
+def capacity_first_days(
+    n_prospects: int,
+    delays: Sequence[int],
+    start_date: date,
+    load: Dict[date, int],
+    capacity: int,
+    mode: str = "greedy",
+    ventilate_days: int = 0,
+    max_days: int = 366,
+) -> np.ndarray:
+    """
+    First day of each prospect such that no day – counting every step of
+    the sequence – goes over *capacity* emails, given the already scheduled
+    per-day *load* (updated in place).
+
+    greedy        fill the earliest working days first
+    proportional  spread over the first *ventilate_days* days in proportion
+                  to each day's free capacity, overflow continues greedily
+
+    Raises ValueError if *max_days* working days are not enough.
+    """
+    load = {np.datetime64(d, "D"): c for d, c in load.items()} if load else {}
+    first = np.busday_offset(np.datetime64(start_date, "D"), 0, roll="forward")
+    out: list = []
+    remaining = n_prospects
+
+    def fits(day) -> tuple:
+        # how many prospects can start on *day*, and the days they'd touch
+        days, counts = np.unique(step_days(day, delays), return_counts=True)
+        free = min((capacity - load.get(d, 0)) // c for d, c in zip(days, counts))
+        return max(int(free), 0), days, counts
+
+    def take(day, k, days, counts) -> None:
+        nonlocal remaining
+        for d, c in zip(days, counts):
+            load[d] = load.get(d, 0) + int(c) * k
+        out.append((day, k))
+        remaining -= k
+
+    if mode == "proportional" and ventilate_days:
+        window = np.busday_offset(first, np.arange(np.busday_count(first, first + ventilate_days) or 1))
+        free = np.array([fits(d)[0] for d in window], dtype=float)
+        if free.sum() > 0:
+            share = np.minimum(free, remaining * free / free.sum())
+            quota = np.floor(share).astype(int)
+            # largest remainders get the leftover prospects
+            for i in np.argsort(quota - share)[: min(remaining, int(free.sum())) - quota.sum()]:
+                quota[i] += 1
+            for day, q in zip(window, quota):
+                k, days, counts = fits(day)
+                if min(k, q):
+                    take(day, min(k, q), days, counts)
+    elif mode not in ("greedy", "proportional"):
+        raise ValueError(f"unknown planning mode {mode!r}")
+
+    day = first
+    for _ in range(max_days):
+        if remaining <= 0:
+            break
+        k, days, counts = fits(day)
+        if k:
+            take(day, min(k, remaining), days, counts)
+        day = np.busday_offset(day, 1)
+    if remaining > 0:
+        raise ValueError(f"not enough daily capacity within {max_days} working days")
+
+    days, counts = zip(*out) if out else ((), ())
+    return np.sort(np.repeat(np.array(days, dtype="datetime64[D]"), counts))
+
+
+def to_datetimes(times: np.ndarray) -> list:
+    """Flatten a plan into Python datetimes (row-major), ready for bulk insert."""
+    return times.astype("datetime64[us]").ravel().tolist()
@@ -0,0 +1,217 @@
+# email-platform/app/rate_limit.py
+# 📄 Token-bucket send-rate limiter (per minute / hour / day, global and per sender)
+#
+# Every bucket is one RateLimitState row, and the row is the source of truth:
+# acquire()/release() lock the rows (SELECT … FOR UPDATE; SQLite takes its
+# database write lock first), refill them from updated_at, take or give back
+# tokens and commit – so the daemon, the API and any number of schedulers
+# share one quota. A missing row (cold start) is created from recent
+# SentEmail counts, to avoid bursting a full day's quota right after deploying.
+
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlmodel import Session, select
+from sqlalchemy import func, update
+
+from app.bulk import bulk_upsert
+from app.config import settings
+from app.models import RateLimitState, SentEmail
+
+WINDOWS = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+class TokenBucket:
+    """*capacity* tokens, refilled continuously over *period* seconds."""
+
+    def __init__(self, capacity: int, period: float, tokens: Optional[float] = None):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity if tokens is None else min(tokens, capacity))
+        self.updated = time.time()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self, now: float) -> int:
+        self._refill(now)
+        return int(self.tokens)
+
+    def wait_time(self, n: int, now: float) -> float:
+        """Seconds until *n* tokens are available."""
+        self._refill(now)
+        missing = min(n, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+
+def parse_sender_limits(spec: str) -> Dict[str, Dict[str, int]]:
+    """
+    "a@x.com=30/500/2000;b@y.com=/200/" → per-sender minute/hour/day caps
+    (empty or 0 = no limit for that window).
+    """
+    out: Dict[str, Dict[str, int]] = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        sender, _, caps = part.partition("=")
+        values = (caps.split("/") + ["", "", ""])[:3]
+        out[sender.strip().lower()] = {
+            window: int(v) for window, v in zip(WINDOWS, values) if v.strip() and int(v) > 0
+        }
+    return out
+
+
+def _ts(dt: datetime) -> float:
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _utc(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+
+class RateLimiter:
+    """
+    Global buckets (RATE_LIMIT_PER_MINUTE, RATE_LIMIT_PER_HOUR,
+    MAX_EMAILS_PER_DAY) plus per-sender buckets from SENDER_RATE_LIMITS.
+    A send needs a token from every bucket that applies to it. All methods
+    work on the persisted rows; acquire() and release() lock and update them
+    in a short transaction of their own, leaving the caller's session alone.
+    """
+
+    def __init__(self, limits: Dict[str, int], sender_limits: Dict[str, Dict[str, int]]):
+        self.limits = {w: c for w, c in limits.items() if c}
+        self.sender_limits = sender_limits
+
+    # ────────────── buckets ──────────────
+    def _keys_for(self, sender: Optional[str]) -> Dict[str, tuple]:
+        keys = {f"global:{w}": (w, c) for w, c in self.limits.items()}
+        if sender:
+            sender = sender.lower()
+            for w, c in self.sender_limits.get(sender, {}).items():
+                keys[f"sender:{sender}:{w}"] = (w, c)
+        return keys
+
+    def _all_keys(self) -> Dict[str, tuple]:
+        keys = {}
+        for sender in [None] + list(self.sender_limits):
+            keys.update(self._keys_for(sender))
+        return keys
+
+    def _buckets(self, session, keys: Dict[str, tuple], lock: bool) -> Dict[str, TokenBucket]:
+        """Refilled buckets for *keys* from their rows (created if missing), optionally row-locked."""
+        if not keys:
+            return {}
+        if lock:
+            self._ensure_rows(session, keys)
+        stmt = select(RateLimitState).where(RateLimitState.key.in_(keys)).order_by(RateLimitState.key)
+        if lock:
+            stmt = stmt.with_for_update()
+        rows = {r.key: r for r in session.exec(stmt.execution_options(populate_existing=True)).all()}
+        seed = None
+        buckets = {}
+        for key, (window, cap) in keys.items():
+            row = rows.get(key)
+            if row is None:  # read-only call before any send: what a cold start would create
+                seed = seed or self._recent_counts(session)
+                bucket = TokenBucket(cap, WINDOWS[window], max(0.0, cap - seed[window]))
+            else:
+                bucket = TokenBucket(cap, WINDOWS[window], row.tokens)
+                bucket.updated = _ts(row.updated_at)
+            buckets[key] = bucket
+        return buckets
+
+    def _ensure_rows(self, session, keys: Dict[str, tuple]) -> None:
+        """Lock the bucket rows for writing, creating missing ones seeded from SentEmail."""
+        # a write first: row locks on Postgres, the database write lock on SQLite
+        # (where FOR UPDATE is a no-op), before anything is read
+        locked = session.exec(
+            update(RateLimitState)
+            .where(RateLimitState.key.in_(keys))
+            .values(tokens=RateLimitState.tokens)
+        ).rowcount
+        if locked == len(keys):
+            return
+        seed = self._recent_counts(session)
+        now = datetime.utcnow()
+        bulk_upsert(session, RateLimitState, [
+            {"key": key, "tokens": float(max(0, cap - seed[window])), "updated_at": now}
+            for key, (window, cap) in keys.items()
+        ], conflict=["key"], update=[])
+
+    def _write(self, session, buckets: Dict[str, TokenBucket]) -> None:
+        for key, b in buckets.items():
+            session.exec(
+                update(RateLimitState)
+                .where(RateLimitState.key == key)
+                .values(tokens=b.tokens, updated_at=_utc(b.updated))
+            )
+        session.commit()
+
+    # ────────────── acquire / release ──────────────
+    def acquire(self, session, n: int, sender: Optional[str] = None) -> int:
+        """Atomically take up to *n* tokens from every applicable bucket; returns how many."""
+        with Session(session.get_bind()) as tx:
+            now = time.time()
+            buckets = self._buckets(tx, self._keys_for(sender), lock=True)
+            granted = min([n] + [b.available(now) for b in buckets.values()])
+            for b in buckets.values():
+                b.tokens -= granted
+            self._write(tx, buckets)
+        return granted
+
+    def release(self, session, n: int, sender: Optional[str] = None) -> None:
+        """Give back tokens acquired for sends that never happened (or failed)."""
+        if n <= 0:
+            return
+        with Session(session.get_bind()) as tx:
+            now = time.time()
+            buckets = self._buckets(tx, self._keys_for(sender), lock=True)
+            for b in buckets.values():
+                b.available(now)
+                b.tokens = min(b.capacity, b.tokens + n)
+            self._write(tx, buckets)
+
+    def available(self, session, sender: Optional[str] = None) -> int:
+        now = time.time()
+        buckets = self._buckets(session, self._keys_for(sender), lock=False)
+        return min([10 ** 9] + [b.available(now) for b in buckets.values()])
+
+    def wait_time(self, session, n: int = 1, sender: Optional[str] = None) -> float:
+        now = time.time()
+        buckets = self._buckets(session, self._keys_for(sender), lock=False)
+        return max([0.0] + [b.wait_time(n, now) for b in buckets.values()])
+
+    def _recent_counts(self, session) -> Dict[str, int]:
+        now = datetime.utcnow()
+        row = session.exec(
+            select(*[
+                func.count().filter(SentEmail.sent_at >= now - timedelta(seconds=secs))
+                for secs in WINDOWS.values()
+            ]).where(SentEmail.status == "sent")
+        ).one()
+        return dict(zip(WINDOWS, row))
+
+    def snapshot(self, session) -> dict:
+        """Every bucket's current level, as stored in the shared rows."""
+        now = time.time()
+        buckets = self._buckets(session, self._all_keys(), lock=False)
+        return {
+            key: {
+                "capacity":      b.capacity,
+                "available":     b.available(now),
+                "refill_per_s":  round(b.rate, 4),
+                "full_in_s":     round(b.wait_time(b.capacity, now), 1),
+            }
+            for key, b in sorted(buckets.items())
+        }
+
+
+rate_limiter = RateLimiter(
+    {
+        "minute": settings.RATE_LIMIT_PER_MINUTE,
+        "hour":   settings.RATE_LIMIT_PER_HOUR,
+        "day":    settings.MAX_EMAILS_PER_DAY,
+    },
+    parse_sender_limits(settings.SENDER_RATE_LIMITS),
+)
@@ -0,0 +1,115 @@
+# email-platform/app/rollups.py
+# 📄 Incrementally maintained send counters for analytics
+#
+# SendRollup keeps one counter per (UTC day of sent_at, sequence, template,
+# status). Every write to SentEmail adjusts it in the same transaction: the
+# send recorder adds each micro-batch's counts, an open moves one count from
+# "sent" to "opened" and deleting a prospect's history subtracts its rows
+# (forget()). So the non-zero counters equal a GROUP BY over SentEmail while
+# staying a handful of rows per day. rebuild() recomputes it from scratch
+# (python -m scripts.rebuild_rollups), e.g. after editing SentEmail by hand.
+
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Iterable, Optional
+
+from sqlmodel import Session, select
+from sqlalchemy import delete, func, insert
+
+from app.bulk import bulk_increment
+from app.models import EmailTemplate, SendRollup, SentEmail, Sequence
+
+KEY = ["day", "sequence_id", "template_id", "status"]
+STATUSES = ("sent", "failed", "opened")
+
+
+def _rows(counts: Counter) -> list[dict]:
+    return [dict(zip(KEY, key), total=n) for key, n in counts.items() if n]
+
+
+def record(session: Session, records: Iterable[dict]) -> None:
+    """Count freshly inserted SentEmail rows (dicts with sent_at/sequence_id/template_id/status)."""
+    counts = Counter(
+        (r["sent_at"].date(), r["sequence_id"] or 0, r["template_id"] or 0, r["status"])
+        for r in records
+    )
+    bulk_increment(session, SendRollup, _rows(counts), conflict=KEY, counters=["total"])
+
+
+def move(session: Session, email: SentEmail, old: str, new: str) -> None:
+    """Re-bucket one SentEmail whose status changed from *old* to *new*."""
+    base = (email.sent_at.date(), email.sequence_id or 0, email.template_id or 0)
+    counts = Counter({(*base, old): -1, (*base, new): 1})
+    bulk_increment(session, SendRollup, _rows(counts), conflict=KEY, counters=["total"])
+
+
+def forget(session: Session, *where) -> None:
+    """Subtract the SentEmail rows matching *where*, before they are deleted. Does not commit."""
+    day = func.date(SentEmail.sent_at)
+    seq = func.coalesce(SentEmail.sequence_id, 0)
+    tpl = func.coalesce(SentEmail.template_id, 0)
+    groups = session.exec(
+        select(day, seq, tpl, SentEmail.status, func.count())
+        .where(*where)
+        .group_by(day, seq, tpl, SentEmail.status)
+    ).all()
+    counts = Counter({(_as_date(d), s, t, status): -n for d, s, t, status, n in groups})
+    bulk_increment(session, SendRollup, _rows(counts), conflict=KEY, counters=["total"])
+
+
+def _as_date(value) -> date:
+    """func.date() is a date on Postgres but an ISO string on SQLite."""
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def rebuild(session: Session) -> int:
+    """Recompute every counter from SentEmail (one INSERT … SELECT … GROUP BY). Does not commit."""
+    session.execute(delete(SendRollup))
+    day = func.date(SentEmail.sent_at)
+    seq = func.coalesce(SentEmail.sequence_id, 0)
+    tpl = func.coalesce(SentEmail.template_id, 0)
+    session.execute(insert(SendRollup).from_select(
+        KEY + ["total"],
+        select(day, seq, tpl, SentEmail.status, func.count()).group_by(day, seq, tpl, SentEmail.status),
+    ))
+    return session.exec(select(func.count()).select_from(SendRollup)).one()
+
+
+# ────────────── reads ──────────────
+def _since(stmt, since: Optional[date]):
+    return stmt.where(SendRollup.day >= since) if since else stmt
+
+
+def totals(session: Session, since: Optional[date] = None) -> dict:
+    """{status: count} over all (or recent) sends."""
+    stmt = select(SendRollup.status, func.sum(SendRollup.total)).group_by(SendRollup.status)
+    out = dict.fromkeys(STATUSES, 0)
+    out.update({status: int(n) for status, n in session.exec(_since(stmt, since)).all()})
+    return out
+
+
+VOLUME_BY = {
+    "sequence": (SendRollup.sequence_id, Sequence),
+    "template": (SendRollup.template_id, EmailTemplate),
+    "day":      (SendRollup.day, None),
+}
+
+
+def volume(session: Session, by: str = "sequence", since: Optional[date] = None) -> list[dict]:
+    """Per sequence / template / day: {key, name, sent, failed, opened, total}."""
+    col, named = VOLUME_BY[by]
+    name = named.name if named is not None else col
+    stmt = select(col, name, SendRollup.status, func.sum(SendRollup.total))
+    if named is not None:
+        stmt = stmt.outerjoin(named, named.id == col)
+    stmt = _since(stmt, since).group_by(col, name, SendRollup.status).order_by(col)
+
+    groups = defaultdict(lambda: dict.fromkeys(STATUSES, 0))
+    names = {}
+    for key, label, status, n in session.exec(stmt).all():
+        groups[key][status] = int(n)
+        names[key] = label
+    return [
+        {"key": key, "name": names[key], **counts, "total": sum(counts.values())}
+        for key, counts in groups.items()
+    ]
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Depends, Request, HTTPException
 from fastapi.responses import Response
 from sqlmodel import Session
+from sqlalchemy import update
+from app import rollups
 from app.database import get_session
 from app.models import SentEmail
 
@@ -13,8 +15,14 @@ def track_open(email_id: int, session: Session = Depends(get_session)):
         raise HTTPException(status_code=404, detail="Email not found")
 
     if email.status == "sent":
-        email.status = "opened"
-        session.add(email)
+        # conditional UPDATE: only the first of concurrent opens moves the counters
+        res = session.exec(
+            update(SentEmail)
+            .where(SentEmail.id == email_id, SentEmail.status == "sent")
+            .values(status="opened")
+        )
+        if res.rowcount:
+            rollups.move(session, email, "sent", "opened")
         session.commit()
 
     # Transparent 1x1 GIF
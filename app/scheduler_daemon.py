@@ -0,0 +1,220 @@
+# email-platform/app/scheduler_daemon.py
+# 📄 Long-running scheduler process (replaces cron + curl /run-scheduler)
+#
+#   python -m app.scheduler_daemon
+#
+# Keeps a min-heap of upcoming (send_at, id) pairs, sleeps until the next one
+# is due and hands due ids to scheduler.run_scheduler(). New rows are picked
+# up incrementally (id > last seen id); a periodic resync within a bounded
+# horizon catches edits and deletions. State is published as a heartbeat file
+# (read by the backend's /scheduler/health) and on a small HTTP endpoint.
+
+import heapq
+import json
+import os
+import signal
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlmodel import Session, select
+from sqlalchemy import func
+
+from app.config import settings
+from app.database import engine
+from app.models import ScheduledEmail
+from app.scheduler import get_now_naive, run_scheduler
+from app.send_queue import release_expired_claims
+
+
+class SchedulerDaemon:
+    def __init__(self):
+        self.poll = settings.SCHEDULER_POLL_SECONDS
+        self.resync_every = settings.SCHEDULER_RESYNC_SECONDS
+        self.horizon = timedelta(hours=settings.SCHEDULER_HORIZON_HOURS)
+        self.batch_size = settings.SCHEDULER_BATCH_SIZE
+
+        self._heap: list[tuple[datetime, int]] = []
+        self._queued: set[int] = set()
+        self._max_id = 0
+        self._stop = threading.Event()
+
+        self.state = {
+            "pid":             os.getpid(),
+            "started_at":      datetime.utcnow().isoformat(),
+            "status":          "starting",
+            "last_beat":       None,
+            "last_run":        None,
+            "last_processed":  0,
+            "total_processed": 0,
+            "queue_size":      0,
+            "horizon_hours":   settings.SCHEDULER_HORIZON_HOURS,
+            "next_due":        None,
+        }
+
+    # ────────────── queue maintenance ──────────────
+    def _push(self, send_at: datetime, sid: int) -> None:
+        if sid not in self._queued:
+            self._queued.add(sid)
+            heapq.heappush(self._heap, (send_at, sid))
+
+    def refresh(self) -> None:
+        """Pull pending rows created since the last refresh (id > high-water mark)."""
+        limit = get_now_naive() + self.horizon
+        with Session(engine) as session:
+            while True:
+                rows = session.exec(
+                    select(ScheduledEmail.id, ScheduledEmail.send_at)
+                    .where(ScheduledEmail.id > self._max_id,
+                           ScheduledEmail.status == "pending")
+                    .order_by(ScheduledEmail.id)
+                    .limit(5000)
+                ).all()
+                if not rows:
+                    return
+                for sid, send_at in rows:
+                    if send_at <= limit:
+                        self._push(send_at, sid)
+                self._max_id = rows[-1][0]
+
+    def resync(self) -> None:
+        """Rebuild the heap from pending rows due within the horizon (after
+        returning expired claims of crashed workers to the queue)."""
+        limit = get_now_naive() + self.horizon
+        self._heap, self._queued = [], set()
+        with Session(engine) as session:
+            released = release_expired_claims(session)
+            if released:
+                print(f"↩️ Released {released} expired claims")
+            # take the high-water mark first so rows inserted meanwhile are
+            # picked up by the next refresh()
+            top = session.exec(select(func.max(ScheduledEmail.id))).one()
+            self._max_id = max(self._max_id, top or 0)
+            # streamed (server-side cursor on Postgres) so a large backlog is
+            # never buffered as one result set
+            rows = session.exec(
+                select(ScheduledEmail.id, ScheduledEmail.send_at)
+                .where(ScheduledEmail.status == "pending",
+                       ScheduledEmail.send_at <= limit)
+                .order_by(ScheduledEmail.send_at)
+                .execution_options(yield_per=5000)
+            )
+            for sid, send_at in rows:
+                self._push(send_at, sid)
+
+    def _pop_due(self, now: datetime) -> list[int]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < self.batch_size:
+            _, sid = heapq.heappop(self._heap)
+            self._queued.discard(sid)
+            due.append(sid)
+        return due
+
+    def _requeue_unsent(self, ids: list[int]) -> int:
+        """Put back ids that are still pending (daily limit, window, SMTP outage…)."""
+        with Session(engine) as session:
+            rows = session.exec(
+                select(ScheduledEmail.id, ScheduledEmail.send_at)
+                .where(ScheduledEmail.id.in_(ids), ScheduledEmail.status == "pending")
+            ).all()
+        for sid, send_at in rows:
+            self._push(send_at, sid)
+        return len(rows)
+
+    # ────────────── heartbeat ──────────────
+    def beat(self, status: str) -> None:
+        self.state.update(
+            status=status,
+            last_beat=datetime.utcnow().isoformat(),
+            queue_size=len(self._heap),
+            next_due=self._heap[0][0].isoformat() if self._heap else None,
+        )
+        path = settings.SCHEDULER_HEARTBEAT_FILE
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, path)
+
+    def serve_health(self, port: int) -> None:
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/health"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.state).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+        threading.Thread(target=server.serve_forever, name="health", daemon=True).start()
+
+    # ────────────── main loop ──────────────
+    def stop(self, *_) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        print(f"⏱ Scheduler daemon started (pid {os.getpid()})")
+        next_refresh = next_resync = datetime.utcnow()
+
+        while not self._stop.is_set():
+            if datetime.utcnow() >= next_resync:
+                self.resync()
+                next_resync = datetime.utcnow() + timedelta(seconds=self.resync_every)
+                next_refresh = datetime.utcnow() + timedelta(seconds=self.poll)
+            elif datetime.utcnow() >= next_refresh:
+                self.refresh()
+                next_refresh = datetime.utcnow() + timedelta(seconds=self.poll)
+
+            due = self._pop_due(get_now_naive())
+            if due:
+                self.beat("sending")
+                try:
+                    processed = run_scheduler(ids=due)
+                except Exception as e:
+                    print(f"❌ Scheduler run failed: {e}")
+                    processed = 0
+                unsent = self._requeue_unsent(due)
+                self.state.update(
+                    last_run=datetime.utcnow().isoformat(),
+                    last_processed=processed,
+                    total_processed=self.state["total_processed"] + processed,
+                )
+                if len(due) == self.batch_size and unsent < len(due):
+                    continue  # more may be due right now
+                if unsent:
+                    # blocked (limit/window/outage) – don't spin on the same ids
+                    self.beat("waiting")
+                    self._stop.wait(self.poll)
+                    continue
+
+            self.beat("idle")
+            wait = self.poll
+            if self._heap:
+                until_due = (self._heap[0][0] - get_now_naive()).total_seconds()
+                wait = min(wait, max(until_due, 0.05))
+            self._stop.wait(wait)
+
+        self.beat("stopped")
+        print("⏹ Scheduler daemon stopped")
+
+
+def main() -> None:
+    daemon = SchedulerDaemon()
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    if settings.SCHEDULER_HEALTH_PORT:
+        daemon.serve_health(settings.SCHEDULER_HEALTH_PORT)
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,22 @@ class AssignSequenceRequest(BaseModel):
     sequence_id: int
     ventilate_days: Optional[int] = 1         # For randomizing spread over days
     start_date: Optional[str] = None          # Start date for scheduling (as string)
+    planning: Optional[str] = "random"        # random | greedy | proportional (capacity-aware)
+
+# --- Bulk prospect edits ---
+class ProspectBulkDelete(BaseModel):
+    ids: List[int]
+
+class ProspectPatch(BaseModel):
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    title: Optional[str] = None
+    company: Optional[str] = None
+    sequence_id: Optional[int] = None       # explicit null clears the sequence
+
+class ProspectBulkPatch(BaseModel):
+    items: List[ProspectPatch]
 
 # --- Sequence schemas (for create/read) ---
 
@@ -0,0 +1,149 @@
+# email-platform/app/send_queue.py
+# 📄 The ScheduledEmail table as a work queue: claiming due rows, releasing
+#    expired claims and prefetching what a claimed batch needs to be sent
+
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+from sqlalchemy import update, or_, and_
+
+from app.bulk import chunked
+from app.models import ScheduledEmail, Prospect, EmailTemplate, Sequence
+from app.config import settings
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+def _claimable(now_utc: datetime):
+    """Pending rows, or claims whose lease ran out (crashed/stuck worker)."""
+    return or_(
+        ScheduledEmail.status == "pending",
+        and_(ScheduledEmail.status == "claimed", ScheduledEmail.claim_expires_at < now_utc),
+    )
+
+def claim_due(session, now: datetime, limit: int | None = None, ids: list[int] | None = None) -> list[ScheduledEmail]:
+    """
+    Atomically move up to *limit* due rows to status 'claimed' for this worker
+    and return them, ordered by send_at. Concurrent schedulers (other
+    processes or nodes) never get the same row: Postgres skips rows another
+    claim has locked (FOR UPDATE SKIP LOCKED); SQLite runs the single UPDATE
+    under its database write lock. Each call uses a unique claim token, so
+    two claims from the same process can't pick up each other's rows.
+    """
+    now_utc = datetime.utcnow()
+    token = f"{WORKER_ID}:{uuid.uuid4().hex[:12]}"
+    candidates = (
+        select(ScheduledEmail.id)
+        .where(
+            ScheduledEmail.send_at <= now,
+            ScheduledEmail.sent_at.is_(None),
+            _claimable(now_utc),
+        )
+        .order_by(ScheduledEmail.send_at)
+        .with_for_update(skip_locked=True)
+    )
+    if ids is not None:
+        candidates = candidates.where(ScheduledEmail.id.in_(ids))
+    if limit is not None:
+        candidates = candidates.limit(limit)
+
+    session.exec(
+        update(ScheduledEmail)
+        .where(ScheduledEmail.id.in_(candidates.scalar_subquery()), _claimable(now_utc))
+        .values(
+            status="claimed",
+            claimed_by=token,
+            claim_expires_at=now_utc + timedelta(seconds=settings.SCHEDULER_CLAIM_LEASE_SECONDS),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return session.exec(
+        select(ScheduledEmail)
+        .where(ScheduledEmail.claimed_by == token, ScheduledEmail.status == "claimed")
+        .order_by(ScheduledEmail.send_at)
+    ).all()
+
+def release_expired_claims(session) -> int:
+    """Return claims whose lease expired to the pending queue."""
+    res = session.exec(
+        update(ScheduledEmail)
+        .where(
+            ScheduledEmail.status == "claimed",
+            ScheduledEmail.claim_expires_at < datetime.utcnow(),
+        )
+        .values(status="pending", claimed_by=None, claim_expires_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return res.rowcount
+
+def release_claims(session, ids) -> int:
+    """Return still-claimed rows among *ids* (claimed but never sent) to the pending queue."""
+    released = 0
+    for chunk in chunked(ids):
+        res = session.exec(
+            update(ScheduledEmail)
+            .where(ScheduledEmail.id.in_(chunk), ScheduledEmail.status == "claimed")
+            .values(status="pending", claimed_by=None, claim_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        released += res.rowcount
+    session.commit()
+    return released
+
+def _fetch_by_ids(session, model, ids, chunk: int = 500) -> dict:
+    """Load rows of *model* whose id is in *ids*, one IN query per chunk."""
+    ids = list(ids)
+    out = {}
+    for i in range(0, len(ids), chunk):
+        for row in session.exec(select(model).where(model.id.in_(ids[i:i + chunk]))):
+            out[row.id] = row
+    return out
+
+def load_send_context(session, batch) -> tuple[dict, dict, dict]:
+    """
+    Prefetch the prospects, templates and sequences a batch of ScheduledEmail
+    rows refers to, returned as id → object maps (a constant number of queries
+    instead of three lookups per email). Sequences are looked up both by the
+    schedule's sequence_id and the prospect's current one.
+    """
+    prospects = _fetch_by_ids(session, Prospect, {e.prospect_id for e in batch})
+    templates = _fetch_by_ids(session, EmailTemplate, {e.template_id for e in batch})
+    seq_ids = {e.sequence_id for e in batch if e.sequence_id}
+    seq_ids |= {p.sequence_id for p in prospects.values() if p.sequence_id}
+    sequences = _fetch_by_ids(session, Sequence, seq_ids)
+    return prospects, templates, sequences
+
+def iter_claimed(session, now: datetime, limit: int | None = None,
+                 ids: list[int] | None = None, chunk: int | None = None,
+                 limiter=None, sender: str | None = None):
+    """
+    Stream the due queue in send_at order as claimed rounds of at most
+    *chunk* rows (SEND_CLAIM_BATCH). Only the current round is ever loaded,
+    and nothing more is pulled once *limit* rows have been claimed or the
+    rate *limiter* runs out of tokens (global and *sender*'s buckets, default
+    SMTP_USER) – a huge backlog costs no more memory than a small one.
+    """
+    chunk = chunk or settings.SEND_CLAIM_BATCH
+    sender = sender or settings.SMTP_USER
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = chunk if remaining is None else min(chunk, remaining)
+        if limiter is not None:
+            granted = limiter.acquire(session, size, sender=sender)
+            claimed = claim_due(session, now, limit=granted, ids=ids) if granted else []
+            limiter.release(session, granted - len(claimed), sender=sender)
+            if granted < size:
+                size = len(claimed)  # out of tokens: this is the last round
+        else:
+            claimed = claim_due(session, now, limit=size, ids=ids)
+        if not claimed:
+            return
+        yield claimed
+        if remaining is not None:
+            remaining -= len(claimed)
+        if len(claimed) < size:
+            return
@@ -0,0 +1,143 @@
+# email-platform/app/smtp_pool.py
+# 📄 Pool of persistent, authenticated SMTP sessions shared by the mailer
+
+import atexit
+import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from queue import LifoQueue, Empty
+
+from app.config import settings
+
+
+class SMTPPool:
+    """
+    Keeps up to *size* logged-in smtplib.SMTP sessions open and lends them out.
+
+    Sessions idle for longer than *check_after* seconds are probed with NOOP
+    before reuse, sessions idle for longer than *idle_timeout* are dropped, and
+    a session whose transaction failed is RSET before going back to the pool.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str = "",
+        password: str = "",
+        size: int = 4,
+        starttls: bool = True,
+        timeout: float = 30,
+        check_after: float = 30,
+        idle_timeout: float = 240,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.size = max(1, size)
+        self.starttls = starttls
+        self.timeout = timeout
+        self.check_after = check_after
+        self.idle_timeout = idle_timeout
+
+        self._idle: LifoQueue = LifoQueue()  # (conn, last_used) – newest first
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    # ────────────── connection lifecycle ──────────────
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                conn.starttls()
+            if self.user:
+                conn.login(self.user, self.password)
+        except Exception:
+            self._close(conn)
+            raise
+        return conn
+
+    @staticmethod
+    def _close(conn: smtplib.SMTP) -> None:
+        try:
+            conn.quit()
+        except Exception:
+            conn.close()
+
+    def _discard(self, conn):
+        if conn is not None:
+            self._close(conn)
+        return None
+
+    def _alive(self, conn: smtplib.SMTP, last_used: float) -> bool:
+        idle = time.monotonic() - last_used
+        if idle >= self.idle_timeout:
+            return False
+        if idle < self.check_after:
+            return True
+        try:
+            return conn.noop()[0] == 250
+        except OSError:  # SMTPException is an OSError
+            return False
+
+    def _checkout(self) -> smtplib.SMTP:
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except Empty:
+                return self._connect()
+            if self._alive(conn, last_used):
+                return conn
+            self._close(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a ready-to-use session; blocks while *size* sessions are in use."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("no SMTP connection available")
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+        except smtplib.SMTPServerDisconnected:
+            conn = self._discard(conn)
+            raise
+        except smtplib.SMTPException:
+            # the session survived but the transaction did not – reset it
+            if conn is not None:
+                try:
+                    conn.rset()
+                except OSError:
+                    conn = self._discard(conn)
+            raise
+        except OSError:
+            conn = self._discard(conn)
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put((conn, time.monotonic()))
+            self._slots.release()
+
+    def close(self) -> None:
+        """QUIT every idle session (used on shutdown)."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except Empty:
+                return
+            self._close(conn)
+
+
+smtp_pool = SMTPPool(
+    settings.SMTP_SERVER,
+    settings.SMTP_PORT,
+    user=settings.SMTP_USER,
+    password=settings.SMTP_PASSWORD,
+    size=settings.SMTP_POOL_SIZE,
+    starttls=settings.SMTP_STARTTLS,
+    timeout=settings.SMTP_TIMEOUT,
+    check_after=settings.SMTP_POOL_CHECK_AFTER,
+    idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT,
+)
+atexit.register(smtp_pool.close)
@@ -0,0 +1,108 @@
+# email-platform/app/template_cache.py
+# 📄 Process-wide LRU cache of compiled Jinja2 templates
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import html2text
+from jinja2 import Environment, StrictUndefined, Template
+
+from app.config import settings
+
+_env = Environment(undefined=StrictUndefined)
+
+_EXPR   = re.compile(r"{{.*?}}", re.S)
+_BLOCKS = re.compile(r"{%|{#")
+_UNSAFE = object()  # cached marker: "no derived plain-text template"
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def derive_plain_text(html: str) -> Optional[str]:
+    """
+    Convert an HTML Jinja2 source into a plain-text Jinja2 source, so the
+    text/plain part can be rendered per prospect instead of running
+    html2text on every rendered body.
+
+    Each {{ expression }} is swapped for an inert token before conversion and
+    restored afterwards. Returns None when that is not safe: control blocks
+    or comments, markup inside an expression, or a token that html2text
+    dropped or duplicated.
+    """
+    if _BLOCKS.search(html):
+        return None
+    exprs = _EXPR.findall(html)
+    if any("<" in e or ">" in e for e in exprs):
+        return None
+
+    tokens = [f"TPLVAR{i}X" for i in range(len(exprs))]
+    it = iter(tokens)
+    text = html2text.html2text(_EXPR.sub(lambda m: next(it), html))
+    if any(text.count(tok) != 1 for tok in tokens):
+        return None
+    for tok, expr in zip(tokens, exprs):
+        text = text.replace(tok, expr)
+    return text
+
+
+class TemplateCache:
+    """
+    Compiled templates keyed by (template id, content hash), plus the derived
+    plain-text templates under (template id, content hash, "text").
+
+    The content hash keeps a stale entry from ever being served after an edit
+    made by another process; invalidate() just frees the old entries early.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[tuple, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text: str, template_id: Optional[int] = None) -> Template:
+        key = (template_id, content_hash(text))
+        with self._lock:
+            tpl = self._items.get(key)
+            if tpl is not None:
+                self._items.move_to_end(key)
+                return tpl
+        tpl = _env.from_string(text)  # compile outside the lock
+        self._put(key, tpl)
+        return tpl
+
+    def get_text(self, html: str, template_id: Optional[int] = None) -> Optional[Template]:
+        """Compiled plain-text counterpart of *html*, or None if it can't be derived."""
+        key = (template_id, content_hash(html), "text")
+        with self._lock:
+            tpl = self._items.get(key)
+            if tpl is not None:
+                self._items.move_to_end(key)
+                return None if tpl is _UNSAFE else tpl
+        source = derive_plain_text(html)
+        tpl = _env.from_string(source) if source is not None else _UNSAFE
+        self._put(key, tpl)
+        return None if tpl is _UNSAFE else tpl
+
+    def _put(self, key: tuple, tpl) -> None:
+        with self._lock:
+            self._items[key] = tpl
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, template_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._items if k[0] == template_id]:
+                del self._items[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+template_cache = TemplateCache(settings.TEMPLATE_CACHE_SIZE)
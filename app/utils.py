@@ -9,6 +9,10 @@ def validate_email(email: str) -> bool:
     pattern = r"[^@]+@[^@]+\.[^@]+"
     return re.match(pattern, email) is not None
 
+def normalize_email(email: str) -> str:
+    """Canonical form stored in Prospect.email (unique): trimmed, lower-case."""
+    return (email or "").strip().lower()
+
 def format_datetime(dt: Optional[datetime]) -> str:
     """Format datetime for display in the UI."""
     if dt is None:
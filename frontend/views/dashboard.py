@@ -9,18 +9,9 @@ from datetime import datetime, timedelta
 API_URL = os.getenv("API_URL", "http://localhost:8000")
 
 @st.cache_data(ttl=60)
-def fetch_sequences():
-    resp = requests.get(f"{API_URL}/sequences")
-    return resp.json() if resp.ok else []
-
-@st.cache_data(ttl=60)
-def fetch_templates():
-    resp = requests.get(f"{API_URL}/templates")
-    return resp.json() if resp.ok else []
-
-@st.cache_data(ttl=60)
-def fetch_sent_emails():
-    resp = requests.get(f"{API_URL}/sent-emails")
+def fetch_volume(by: str):
+    """Send counts per sequence/template from the backend rollups."""
+    resp = requests.get(f"{API_URL}/analytics/volume", params={"by": by})
     return resp.json() if resp.ok else []
 
 @st.cache_data(ttl=60)
@@ -32,8 +23,45 @@ def fetch_cron_log():
     resp.raise_for_status()
     return resp.json().get("lines", [])
 
+@st.cache_data(ttl=10)
+def fetch_scheduler_health():
+    """Call backend `/scheduler/health`; None if the daemon never reported."""
+    resp = requests.get(f"{API_URL}/scheduler/health")
+    if resp.status_code == 404:
+        return None
+    resp.raise_for_status()
+    return resp.json()
+
+def show_scheduler_status():
+    st.subheader("⏱ Scheduler Monitor")
+    try:
+        health = fetch_scheduler_health()
+    except Exception as e:
+        st.error(f"Error fetching scheduler health: {e}")
+        return
+
+    if health is None:
+        # no daemon yet – fall back to the legacy cron log
+        show_cron_status()
+        return
+
+    if health.get("alive"):
+        st.success(f"Scheduler daemon {health.get('status')} (pid {health.get('pid')})")
+    else:
+        st.error(f"Scheduler daemon not responding – last heartbeat {health.get('last_beat') or '-'}")
+    c1, c2, c3 = st.columns(3)
+    horizon = health.get("horizon_hours")
+    c1.metric(f"Queued (next {horizon:g}h)" if horizon else "Queued", health.get("queue_size", 0))
+    c2.metric("Last run sent", health.get("last_processed", 0))
+    c3.metric("Sent since start", health.get("total_processed", 0))
+    st.caption(
+        f"Last run: {health.get('last_run') or '-'} · "
+        f"Next due: {health.get('next_due') or '-'} · "
+        f"Heartbeat: {health.get('last_beat') or '-'}"
+    )
+
 def show_cron_status():
-    st.subheader("⏱ Cron Job Monitor")
+    st.caption("Cron log (legacy)")
     try:
         lines = fetch_cron_log()
     except FileNotFoundError:
@@ -61,8 +89,8 @@ def show_cron_status():
 def show():
     st.title("📊 Email Platform Dashboard")
 
-    # Cron monitor
-    show_cron_status()
+    # Scheduler monitor
+    show_scheduler_status()
 
     # Analytics summary
     resp = requests.get(f"{API_URL}/analytics/summary")
@@ -80,28 +108,13 @@ def show():
     st.divider()
     st.subheader("📈 Volume by Sequence & Template")
 
-    sent_emails = fetch_sent_emails()
-    seqs = fetch_sequences()
-    tmpls = fetch_templates()
-    seq_map = {s['id']: s['name'] for s in seqs}
-    tmpl_map = {t['id']: t['name'] for t in tmpls}
-
-    if sent_emails:
-        df = pd.DataFrame(sent_emails)
-        if 'sequence_id' in df.columns:
-            df['sequence_name'] = df['sequence_id'].map(seq_map).fillna('')
-        if 'template_id' in df.columns:
-            df['template_name'] = df['template_id'].map(tmpl_map).fillna('')
-
-        st.markdown("#### Emails Sent by Sequence")
-        if 'sequence_name' in df:
-            seq_grp = df.groupby('sequence_name').size().reset_index(name='count')
-            st.bar_chart(seq_grp.set_index('sequence_name'))
-
-        st.markdown("#### Emails Sent by Template")
-        if 'template_name' in df:
-            tmpl_grp = df.groupby('template_name').size().reset_index(name='count')
-            st.bar_chart(tmpl_grp.set_index('template_name'))
+    for by, label in (("sequence", "Sequence"), ("template", "Template")):
+        volume = fetch_volume(by)
+        if volume:
+            st.markdown(f"#### Emails Sent by {label}")
+            df = pd.DataFrame(volume)
+            df["name"] = df["name"].fillna("")
+            st.bar_chart(df.groupby("name")[["sent", "opened", "failed"]].sum())
 
     st.divider()
     st.subheader("🕒 Recent Deliveries")
@@ -3,6 +3,7 @@ import datetime as _dt
 import io
 import csv
 import pandas as pd
+import time
 import requests
 import streamlit as st
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
@@ -21,6 +22,21 @@ STATUS = {
 def _pretty_status(key: str | None) -> str:
     return STATUS.get(key, (key or "").capitalize())
 
+def _run_assign_job(payload: dict) -> dict:
+    """Queue a sequence assignment job and poll it, showing a progress bar."""
+    r = requests.post(f"{API_URL}/jobs/assign-sequence", json=payload, timeout=30)
+    r.raise_for_status()
+    job = r.json()
+    bar = st.progress(0.0, text="Scheduling…")
+    while job["status"] in ("queued", "running"):
+        time.sleep(0.5)
+        job = requests.get(f"{API_URL}/jobs/{job['id']}", timeout=10).json()
+        bar.progress(min(job["progress"], 1.0),
+                     text=f"Scheduling… {job['done']}/{job['total']} ({job['items_per_s']}/s)")
+    if job["status"] != "done":
+        raise RuntimeError(job.get("error") or job["status"])
+    return job
+
 def _extract(grid_resp, key: str) -> list[dict]:
     v = grid_resp.get(key)
     if v is None:
@@ -34,6 +50,59 @@ def _extract(grid_resp, key: str) -> list[dict]:
     except:
         return []
 
+PAGE_SIZES = [10, 20, 50, 100]
+SORTS = {"Newest": ("created_at", "desc"), "Oldest": ("created_at", "asc"),
+         "Name": ("name", "asc"), "Email": ("email", "asc")}
+
+def _fetch_page(prefix: str, params: dict) -> dict:
+    """Fetch the current server-side page; visited cursors live in session_state."""
+    sig = tuple(sorted(params.items()))
+    if st.session_state.get(f"{prefix}_sig") != sig:
+        st.session_state[f"{prefix}_sig"] = sig
+        st.session_state[f"{prefix}_cursors"] = [None]
+    cursor = st.session_state[f"{prefix}_cursors"][-1]
+    r = requests.get(f"{API_URL}/prospects", params={**params, "cursor": cursor, "with_total": True})
+    r.raise_for_status()
+    return r.json()
+
+def _pager(prefix: str, page: dict):
+    cursors = st.session_state[f"{prefix}_cursors"]
+    c1, c2, c3 = st.columns([1, 1, 4])
+    if c1.button("◀ Prev", disabled=len(cursors) == 1, key=f"{prefix}_prev"):
+        cursors.pop(); st.rerun()
+    if c2.button("Next ▶", disabled=not page["next_cursor"], key=f"{prefix}_next"):
+        cursors.append(page["next_cursor"]); st.rerun()
+    c3.caption(f"Page {len(cursors)} · {page['total']} matching")
+
+def _all_ids(params: dict) -> list[int]:
+    """Ids of every prospect matching *params*, page by page (for "Select ALL")."""
+    ids, cursor = [], None
+    while True:
+        r = requests.get(f"{API_URL}/prospects", params={**params, "limit": 500, "cursor": cursor})
+        r.raise_for_status(); page = r.json()
+        ids += [p["id"] for p in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return ids
+
+def _bulk_delete(ids: list[int]) -> dict:
+    r = requests.post(f"{API_URL}/prospects/bulk-delete", json={"ids": ids}); r.raise_for_status()
+    return r.json()
+
+def _bulk_patch(items: list[dict]) -> dict:
+    r = requests.patch(f"{API_URL}/prospects/bulk", json={"items": items}); r.raise_for_status()
+    return r.json()
+
+def _list_filters(prefix: str, assigned: bool) -> dict:
+    c1, c2, c3 = st.columns([3, 1, 1])
+    search = c1.text_input("🔍 Search email, name or company", value="", key=f"search_{prefix}")
+    sort, order = SORTS[c2.selectbox("Sort", list(SORTS), key=f"{prefix}_sort")]
+    size = c3.selectbox("Rows per page", PAGE_SIZES, index=1, key=f"{prefix}_page_size")
+    params = {"assigned": assigned, "sort": sort, "order": order, "limit": size}
+    if search:
+        params["q"] = search
+    return params
+
 @st.cache_data(ttl=60)
 def _fetch_sequences() -> list[dict]:
     r = requests.get(f"{API_URL}/sequences")
@@ -78,14 +147,17 @@ def show():
             parsed = _parse_csv(csv_file)
             st.success(f"Parsed {len(parsed)} rows.")
             if st.button("➕ Import All"):
-                ok = bad = 0
-                for rec in parsed:
-                    try:
-                        r = requests.post(f"{API_URL}/prospects", json=rec)
-                        r.raise_for_status(); ok += 1
-                    except: bad += 1
-                st.success(f"Imported {ok}, failed {bad}")
-                st.cache_data.clear(); st.rerun()
+                try:
+                    r = requests.post(f"{API_URL}/prospects/import",
+                                      files={"file": (csv_file.name, csv_file.getvalue(), "text/csv")})
+                    r.raise_for_status(); res = r.json()
+                    st.success(f"Imported {res['inserted']}, updated {res['updated']}, "
+                               f"skipped {res['skipped']}, failed {res['failed']}")
+                    if res["errors"]:
+                        with st.expander("Row errors"):
+                            st.dataframe(pd.DataFrame(res["errors"]), use_container_width=True)
+                except Exception as ex: st.error(f"Import failed: {ex}")
+                st.cache_data.clear()
 
         # Add single prospect
         st.subheader("➕ Add Single Prospect")
@@ -100,42 +172,40 @@ def show():
             else:
                 try:
                     r = requests.post(f"{API_URL}/prospects", json={"name":n,"email":e,"title":t,"company":c})
-                    r.raise_for_status(); st.success("Prospect added"); st.cache_data.clear(); st.rerun()
+                    if r.status_code == 409:
+                        st.warning("A prospect with this email already exists")
+                    else:
+                        r.raise_for_status(); st.success("Prospect added"); st.cache_data.clear(); st.rerun()
                 except Exception as ex:
                     st.error(f"Failed: {ex}")
 
         st.divider()
         st.subheader("🆕 Unassigned Prospects")
-        # Fetch unassigned
+        params = _list_filters("new", False)
         try:
-            resp = requests.get(f"{API_URL}/prospects", params={"assigned":False}); resp.raise_for_status()
-            unassigned = resp.json()
+            page = _fetch_page("new", params)
+            unassigned = page["items"]
         except Exception as ex:
-            st.error(f"Fetch error: {ex}"); unassigned = []
+            st.error(f"Fetch error: {ex}"); return
 
         df_un = pd.DataFrame(unassigned)
         if df_un.empty:
             st.info("No unassigned prospects.")
             return
 
-        # Email search
-        search = st.text_input("🔍 Search by Email", value="", key="search_email_new")
-        if search:
-            df_un = df_un[df_un["email"].str.contains(search, case=False, na=False)]
-
         # Table & selection
-        sel_all = st.checkbox("Select ALL", key="new_sel_all")
+        sel_all = st.checkbox(f"Select ALL {page['total']} matching", key="new_sel_all")
         prev_ids = st.session_state.get("new_sel_ids", [])
         pre = [r for r in unassigned if r["id"] in prev_ids]
         gb = GridOptionsBuilder.from_dataframe(df_un)
         gb.configure_side_bar(); gb.configure_selection("multiple", use_checkbox=True, pre_selected_rows=pre)
-        gb.configure_pagination(paginationAutoPageSize=False, paginationPageSize=st.session_state.get("new_page_size",20))
         grid = AgGrid(df_un, gridOptions=gb.build(), update_mode=GridUpdateMode.SELECTION_CHANGED,
                       allow_unsafe_jscode=True, enable_enterprise_modules=True, key="new_ag")
+        _pager("new", page)
         selected = _extract(grid, "selected_rows")
-        if sel_all: selected = df_un.to_dict("records")
         st.session_state["new_sel_ids"] = [r["id"] for r in selected if r.get("id")]
-        st.caption(f"Selected: {len(selected)}")
+        n_selected = page["total"] if sel_all else len(selected)
+        st.caption(f"Selected: {n_selected}")
 
         # Bulk actions
         c1, c2 = st.columns([3,1])
@@ -143,34 +213,34 @@ def show():
             seq_pick = st.selectbox("Sequence", list(name_to_id.keys()))
             start = st.date_input("First email date", value=_dt.date.today())
             vent = st.number_input("Spread over N days", 0,365,0)
-            assign = st.button("Assign →", disabled=not selected)
+            plan = st.radio("Planning", ["random","greedy","proportional"], horizontal=True,
+                            help="greedy/proportional never schedule a day beyond the daily send limit")
+            assign = st.button("Assign →", disabled=not n_selected)
         if assign:
-            ids = [r["id"] for r in selected if r.get("id")]
             try:
-                r2 = requests.post(f"{API_URL}/assign-sequence", json={"prospect_ids":ids,
+                ids = _all_ids(params) if sel_all else [r["id"] for r in selected if r.get("id")]
+                _run_assign_job({"prospect_ids":ids,
                             "sequence_id":name_to_id[seq_pick],"ventilate_days":vent,
-                            "start_date":str(start)})
-                r2.raise_for_status(); st.success("Assigned ✔"); st.cache_data.clear(); st.rerun()
+                            "start_date":str(start),"planning":plan})
+                st.success("Assigned ✔"); st.cache_data.clear(); st.rerun()
             except Exception as ex: st.error(f"Assign failed: {ex}")
 
-        if selected:
-            st.divider(); st.markdown(f"**Bulk actions ({len(selected)})**")
+        if n_selected:
+            st.divider(); st.markdown(f"**Bulk actions ({n_selected})**")
             if st.button("❌ Delete Selected Prospects"):
-                for x in selected:
-                    try: requests.delete(f"{API_URL}/prospects/{x['id']}")
-                    except Exception as ex: st.error(f"Failed to delete ID {x['id']}: {ex}")
-                st.success("Deleted ✔"); st.cache_data.clear(); st.rerun()
-
-        st.selectbox("Rows per page (New)", [10,20,50,100],
-                     index=[10,20,50,100].index(st.session_state.get("new_page_size",20)),
-                     key="new_page_size")
+                try:
+                    ids = _all_ids(params) if sel_all else [r["id"] for r in selected if r.get("id")]
+                    res = _bulk_delete(ids)
+                    st.success(f"Deleted {res['deleted']} ✔"); st.cache_data.clear(); st.rerun()
+                except Exception as ex: st.error(f"Delete failed: {ex}")
 
     # ─── Active Prospects ───────────────────────────────────────────────────────
     else:
         st.subheader("📋 Active Prospects")
+        params = _list_filters("act", True)
         try:
-            resp = requests.get(f"{API_URL}/prospects", params={"assigned":True}); resp.raise_for_status()
-            active = resp.json() or []
+            page = _fetch_page("act", params)
+            active = page["items"]
         except Exception as ex:
             st.error(f"Fetch error: {ex}"); return
 
@@ -185,35 +255,28 @@ def show():
             p["status"] = _pretty_status("completed" if done==total and total>0 else "in_progress")
 
         df_act = pd.DataFrame(active)
-        if df_act.empty:
-            st.info("No active prospects to show."); return
-
-        search_a = st.text_input("🔍 Search by Email", value="", key="search_email_active")
-        if search_a:
-            df_act = df_act[df_act["email"].str.contains(search_a, case=False, na=False)]
-
         for col in ["sequence_steps_total","sequence_step_current","sequence_progress_pct"]:
             if col in df_act.columns: df_act.drop(columns=[col], inplace=True)
 
         prev2 = st.session_state.get("act_sel_ids", [])
         pre2 = [r for r in active if r["id"] in prev2]
-        page_size = st.selectbox("Rows per page (Active)",[10,20,50,100],
-                                 index=[10,20,50,100].index(st.session_state.get("act_page_size",20)),
-                                 key="act_page_size")
 
         gb2 = GridOptionsBuilder.from_dataframe(df_act)
         gb2.configure_side_bar(); gb2.configure_selection("multiple",use_checkbox=True,pre_selected_rows=pre2)
-        gb2.configure_pagination(paginationAutoPageSize=False,paginationPageSize=page_size)
         grid2 = AgGrid(df_act, gridOptions=gb2.build(), update_mode=GridUpdateMode.MODEL_CHANGED,
                        allow_unsafe_jscode=True, enable_enterprise_modules=True, key="act_ag")
+        _pager("act", page)
         sel2 = _extract(grid2,"selected_rows"); edit2 = _extract(grid2,"data")
         st.session_state["act_sel_ids"] = [r["id"] for r in sel2 if r.get("id")]
 
         if st.button("💾 Save edits"):
-            for row in edit2:
-                payload = {k:row[k] for k in ("name","email","title","company") if k in row}
-                requests.put(f"{API_URL}/prospects/{row['id']}", json=payload)
-            st.success("Saved ✔"); st.cache_data.clear(); st.rerun()
+            items = [{k:row[k] for k in ("id","name","email","title","company") if k in row} for row in edit2]
+            try:
+                res = _bulk_patch(items)
+                conflicts = [r["id"] for r in res["results"] if r["status"] == "conflict"]
+                if conflicts: st.warning(f"Email already used by another prospect: IDs {conflicts}")
+                st.success(f"Saved {res['updated']} changed ✔"); st.cache_data.clear(); st.rerun()
+            except Exception as ex: st.error(f"Save failed: {ex}")
 
         if len(sel2)==1:
             p = sel2[0]
@@ -239,16 +302,16 @@ def show():
                 pick2 = st.selectbox("Re-assign to sequence", list(name_to_id.keys()))
                 if st.button("Re-assign"):
                     try:
-                        r3 = requests.post(f"{API_URL}/assign-sequence", json={
+                        _run_assign_job({
                             "prospect_ids":[x['id'] for x in sel2],"sequence_id":name_to_id[pick2],"ventilate_days":0})
-                        r3.raise_for_status(); st.success("Re-assigned ✔"); st.cache_data.clear(); st.rerun()
+                        st.success("Re-assigned ✔"); st.cache_data.clear(); st.rerun()
                     except Exception as e: st.error(f"Failed: {e}")
             with b2:
                 if st.button("Clear sequence"):
-                    for x in sel2: requests.put(f"{API_URL}/prospects/{x['id']}", json={"sequence_id":None})
+                    _bulk_patch([{"id":x["id"],"sequence_id":None} for x in sel2])
                     st.success("Cleared ✔"); st.cache_data.clear(); st.rerun()
             with b3:
                 if st.button("❌ Delete"):
-                    for x in sel2: requests.delete(f"{API_URL}/prospects/{x['id']}")
+                    _bulk_delete([x["id"] for x in sel2])
                     st.warning("Deleted ✔"); st.cache_data.clear(); st.rerun()
 
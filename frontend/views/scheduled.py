@@ -13,6 +13,7 @@ API_URL = os.getenv("API_URL", "http://localhost:8000")
 # Emoji tags for status column
 STATUS_EMOJI = {
     "pending":   "🟧 Pending",
+    "claimed":   "🟪 Sending",
     "scheduled": "🟦 Scheduled",
     "sent":      "🟩 Sent",
     "failed":    "🟥 Failed",
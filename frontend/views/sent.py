@@ -1,5 +1,7 @@
 import os
+import datetime as _dt
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import requests
 
@@ -16,10 +18,7 @@ STATUS_COLORS = {
     "completed":   "⬜️ Completed"
 }
 
-@st.cache_data(ttl=60)
-def fetch_templates():
-    resp = requests.get(f"{API_URL}/templates")
-    return resp.json() if resp.ok else []
+PAGE_SIZES = [25, 50, 100, 250]
 
 @st.cache_data(ttl=60)
 def fetch_sequences():
@@ -27,31 +26,55 @@ def fetch_sequences():
     return resp.json() if resp.ok else []
 
 @st.cache_data(ttl=60)
-def fetch_sent_emails():
-    resp = requests.get(f"{API_URL}/sent-emails")
-    return resp.json() if resp.ok else []
+def fetch_sent_page(params: tuple, cursor: str | None):
+    """One page of /sent-emails (no bodies) for the given filter params."""
+    resp = requests.get(f"{API_URL}/sent-emails", params={**dict(params), "cursor": cursor, "with_total": True})
+    resp.raise_for_status()
+    return resp.json()
+
+def fetch_sent_email(sid: int):
+    resp = requests.get(f"{API_URL}/sent-emails/{sid}")
+    resp.raise_for_status()
+    return resp.json()
 
 def show():
     st.title("📬 Sent Emails Log")
 
-    data = fetch_sent_emails()
+    # Filters (applied server-side)
+    sequences = fetch_sequences()
+    seq_ids = {s["name"]: s["id"] for s in sequences}
+    c1, c2, c3, c4 = st.columns([2, 2, 3, 1])
+    status = c1.multiselect("Status", ["sent", "failed", "opened", "bounced"], key="sent_status")
+    seq = c2.selectbox("Sequence", ["All", *seq_ids], key="sent_seq")
+    dates = c3.date_input("Sent between", value=(), key="sent_dates")
+    size = c4.selectbox("Rows", PAGE_SIZES, key="sent_page_size")
+    params = {"limit": size}
+    if status:
+        params["status"] = ",".join(status)
+    if seq != "All":
+        params["sequence_id"] = seq_ids[seq]
+    if len(dates) == 2:
+        params["since"] = str(dates[0])
+        params["until"] = str(dates[1] + _dt.timedelta(days=1))
+    params = tuple(sorted(params.items()))
+
+    if st.session_state.get("sent_sig") != params:
+        st.session_state["sent_sig"] = params
+        st.session_state["sent_cursors"] = [None]
+    cursors = st.session_state["sent_cursors"]
+    try:
+        page = fetch_sent_page(params, cursors[-1])
+    except Exception as e:
+        st.error(f"Fetch error: {e}"); return
+    data = page["items"]
     if not data:
         st.info("No emails have been sent yet.")
         return
 
     df = pd.DataFrame(data)
     df["sent_at"] = pd.to_datetime(df["sent_at"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    # Map template and sequence names if IDs exist
-    templates = fetch_templates()
-    template_map = {t["id"]: t["name"] for t in templates}
-    sequences = fetch_sequences()
-    sequence_map = {s["id"]: s["name"] for s in sequences}
-
-    if "template_id" in df.columns:
-        df["template_name"] = df["template_id"].map(template_map).fillna("")
-    if "sequence_id" in df.columns:
-        df["sequence_name"] = df["sequence_id"].map(sequence_map).fillna("")
+    df["sequence_name"] = df["sequence_name"].fillna("")
+    df["template_name"] = df["template_name"].fillna("")
 
     # Status with color/emoji
     def status_tag(row):
@@ -60,14 +83,28 @@ def show():
 
     df["status_tag"] = df.apply(status_tag, axis=1)
 
-    columns_to_show = ["id", "to", "subject", "status_tag", "sent_at"]
-    if "sequence_name" in df.columns:
-        columns_to_show.append("sequence_name")
-    if "template_name" in df.columns:
-        columns_to_show.append("template_name")
-
+    columns_to_show = ["id", "to", "subject", "status_tag", "sent_at", "sequence_name", "template_name"]
     st.dataframe(df[columns_to_show], use_container_width=True)
 
+    p1, p2, p3 = st.columns([1, 1, 4])
+    if p1.button("◀ Prev", disabled=len(cursors) == 1, key="sent_prev"):
+        cursors.pop(); st.rerun()
+    if p2.button("Next ▶", disabled=not page["next_cursor"], key="sent_next"):
+        cursors.append(page["next_cursor"]); st.rerun()
+    p3.caption(f"Page {len(cursors)} · {page['total']} matching")
+
+    # Full content is fetched only for the email being viewed
+    with st.expander("🔎 View email"):
+        sid = st.selectbox("Email", df["id"].tolist(),
+                           format_func=lambda i: f"#{i} – {df.loc[df['id'] == i, 'subject'].iloc[0]}")
+        if st.button("Load body"):
+            try:
+                email = fetch_sent_email(sid)
+                st.markdown(f"**To:** {email['to']}  \n**Subject:** {email['subject']}")
+                components.html(email["body"] or "", height=400, scrolling=True)
+            except Exception as e:
+                st.error(f"Load failed: {e}")
+
     # Clear All Sent Emails (uses dev endpoint)
     st.divider()
     st.subheader("Danger: Clear All Sent Emails")
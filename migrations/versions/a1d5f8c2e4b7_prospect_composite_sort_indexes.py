@@ -0,0 +1,34 @@
+"""Composite prospect sort indexes
+
+Revision ID: a1d5f8c2e4b7
+Revises: e7a3c9f1d2b8
+Create Date: 2026-10-17 21:40:18.902164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a1d5f8c2e4b7'
+down_revision: Union[str, Sequence[str], None] = 'e7a3c9f1d2b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_prospect_name_id', 'prospect', ['name', 'id'], unique=False)
+    op.create_index('ix_prospect_created_at_id', 'prospect', ['created_at', 'id'], unique=False)
+    op.drop_index(op.f('ix_prospect_name'), table_name='prospect')
+    op.drop_index(op.f('ix_prospect_created_at'), table_name='prospect')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_prospect_created_at'), 'prospect', ['created_at'], unique=False)
+    op.create_index(op.f('ix_prospect_name'), 'prospect', ['name'], unique=False)
+    op.drop_index('ix_prospect_created_at_id', table_name='prospect')
+    op.drop_index('ix_prospect_name_id', table_name='prospect')
@@ -0,0 +1,28 @@
+"""Scheduled email per-prospect index
+
+Revision ID: a6c0e3b8d5f4
+Revises: f2a8d4c6b1e7
+Create Date: 2026-10-17 16:40:12.337905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c0e3b8d5f4'
+down_revision: Union[str, Sequence[str], None] = 'f2a8d4c6b1e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_scheduledemail_prospect_id_status', 'scheduledemail', ['prospect_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_scheduledemail_prospect_id_status', table_name='scheduledemail')
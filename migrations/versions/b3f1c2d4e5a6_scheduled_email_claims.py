@@ -0,0 +1,38 @@
+"""ScheduledEmail claim columns
+
+Revision ID: b3f1c2d4e5a6
+Revises: 5709abcc18d4
+Create Date: 2026-10-17 09:12:44.102311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, Sequence[str], None] = '5709abcc18d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('scheduledemail', sa.Column('claimed_by', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('scheduledemail', sa.Column('claim_expires_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_scheduledemail_claimed_by', 'scheduledemail', ['claimed_by'], unique=False)
+    op.create_index('ix_scheduledemail_status_send_at', 'scheduledemail', ['status', 'send_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # return in-flight claims to the queue before dropping the columns
+    op.execute("UPDATE scheduledemail SET status = 'pending' WHERE status = 'claimed'")
+    op.drop_index('ix_scheduledemail_status_send_at', table_name='scheduledemail')
+    op.drop_index('ix_scheduledemail_claimed_by', table_name='scheduledemail')
+    with op.batch_alter_table('scheduledemail') as batch_op:
+        batch_op.drop_column('claim_expires_at')
+        batch_op.drop_column('claimed_by')
@@ -0,0 +1,28 @@
+"""Sent email sent_at index
+
+Revision ID: b9e4f7a2c8d3
+Revises: a6c0e3b8d5f4
+Create Date: 2026-10-17 17:15:51.902614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4f7a2c8d3'
+down_revision: Union[str, Sequence[str], None] = 'a6c0e3b8d5f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_sentemail_sent_at'), 'sentemail', ['sent_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sentemail_sent_at'), table_name='sentemail')
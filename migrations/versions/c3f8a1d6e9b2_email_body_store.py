@@ -0,0 +1,108 @@
+"""Content-addressed sent email bodies
+
+Revision ID: c3f8a1d6e9b2
+Revises: b9e4f7a2c8d3
+Create Date: 2026-10-17 17:58:03.620417
+
+"""
+import hashlib
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1d6e9b2'
+down_revision: Union[str, Sequence[str], None] = 'b9e4f7a2c8d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH = 5000  # sentemail rows per backfill round
+
+
+def _backfill() -> None:
+    """Move every sentemail.body into emailbody (deduplicated), BATCH rows at a time."""
+    conn = op.get_bind()
+    known = set()
+    last = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, body FROM sentemail WHERE id > :last ORDER BY id LIMIT :n"),
+            {"last": last, "n": BATCH},
+        ).fetchall()
+        if not rows:
+            break
+        new, links = {}, []
+        for sid, body in rows:
+            raw = (body or "").encode("utf-8")
+            h = hashlib.sha256(raw).hexdigest()
+            links.append({"h": h, "id": sid})
+            if h not in known:
+                new[h] = raw
+        if new:
+            stored = set(conn.execute(
+                sa.text("SELECT hash FROM emailbody WHERE hash IN :hs").bindparams(
+                    sa.bindparam("hs", expanding=True)),
+                {"hs": list(new)},
+            ).scalars())
+            missing = [{"h": h, "d": zlib.compress(raw), "s": len(raw)}
+                       for h, raw in new.items() if h not in stored]
+            if missing:
+                conn.execute(sa.text("INSERT INTO emailbody (hash, data, size) VALUES (:h, :d, :s)"), missing)
+            known.update(new)
+        conn.execute(sa.text("UPDATE sentemail SET body_hash = :h WHERE id = :id"), links)
+        last = rows[-1][0]
+
+
+def _restore() -> None:
+    """Write the decompressed bodies back into sentemail.body, BATCH rows at a time."""
+    conn = op.get_bind()
+    bodies = {}
+    last = 0
+    while True:
+        rows = conn.execute(
+            sa.text("SELECT id, body_hash FROM sentemail WHERE id > :last ORDER BY id LIMIT :n"),
+            {"last": last, "n": BATCH},
+        ).fetchall()
+        if not rows:
+            break
+        for _, h in rows:
+            if h is not None and h not in bodies:
+                data = conn.execute(sa.text("SELECT data FROM emailbody WHERE hash = :h"), {"h": h}).scalar()
+                bodies[h] = zlib.decompress(data).decode("utf-8") if data is not None else ""
+        conn.execute(
+            sa.text("UPDATE sentemail SET body = :b WHERE id = :id"),
+            [{"b": bodies.get(h, ""), "id": sid} for sid, h in rows],
+        )
+        last = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('emailbody',
+    sa.Column('hash', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    with op.batch_alter_table('sentemail') as batch_op:
+        batch_op.add_column(sa.Column('body_hash', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+        batch_op.create_foreign_key('fk_sentemail_body_hash_emailbody', 'emailbody', ['body_hash'], ['hash'])
+    _backfill()
+    with op.batch_alter_table('sentemail') as batch_op:
+        batch_op.drop_column('body')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('sentemail') as batch_op:
+        batch_op.add_column(sa.Column('body', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    _restore()
+    with op.batch_alter_table('sentemail') as batch_op:
+        batch_op.alter_column('body', existing_type=sqlmodel.sql.sqltypes.AutoString(), nullable=False)
+        batch_op.drop_constraint('fk_sentemail_body_hash_emailbody', type_='foreignkey')
+        batch_op.drop_column('body_hash')
+    op.drop_table('emailbody')
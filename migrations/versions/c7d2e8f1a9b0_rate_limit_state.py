@@ -0,0 +1,34 @@
+"""Rate limiter state
+
+Revision ID: c7d2e8f1a9b0
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-17 11:40:05.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e8f1a9b0'
+down_revision: Union[str, Sequence[str], None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ratelimitstate',
+    sa.Column('key', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ratelimitstate')
@@ -0,0 +1,43 @@
+"""Send rollup counters
+
+Revision ID: d8b2e5f9a4c1
+Revises: c3f8a1d6e9b2
+Create Date: 2026-10-17 18:44:36.215870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b2e5f9a4c1'
+down_revision: Union[str, Sequence[str], None] = 'c3f8a1d6e9b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('sendrollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sequence_id', sa.Integer(), nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'sequence_id', 'template_id', 'status')
+    )
+    # same as app.rollups.rebuild()
+    op.execute("""
+        INSERT INTO sendrollup (day, sequence_id, template_id, status, total)
+        SELECT date(sent_at), coalesce(sequence_id, 0), coalesce(template_id, 0), status, count(*)
+        FROM sentemail
+        GROUP BY date(sent_at), coalesce(sequence_id, 0), coalesce(template_id, 0), status
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('sendrollup')
@@ -0,0 +1,52 @@
+"""Unique normalized prospect email
+
+Revision ID: e5b1c7d9f3a2
+Revises: d4a9b6c3e2f1
+Create Date: 2026-10-17 15:21:09.114273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1c7d9f3a2'
+down_revision: Union[str, Sequence[str], None] = 'd4a9b6c3e2f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# oldest prospect per normalized email is kept, the others are merged into it
+KEEPER = "(SELECT min(k.id) FROM prospect k WHERE k.email = prospect.email)"
+DUPLICATES = """
+    SELECT p.id FROM prospect p
+    WHERE p.id > (SELECT min(k.id) FROM prospect k WHERE k.email = p.email)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("UPDATE prospect SET email = lower(trim(email))")
+    # an unsubscribe on any duplicate sticks to the keeper
+    op.execute(f"""
+        UPDATE prospect SET unsubscribed = true
+        WHERE id = {KEEPER} AND EXISTS (
+            SELECT 1 FROM prospect d WHERE d.email = prospect.email AND d.unsubscribed
+        )
+    """)
+    op.execute(f"DELETE FROM scheduledemail WHERE prospect_id IN ({DUPLICATES})")
+    op.execute(f"""
+        UPDATE sentemail SET prospect_id = (
+            SELECT min(k.id) FROM prospect k
+            WHERE k.email = (SELECT d.email FROM prospect d WHERE d.id = sentemail.prospect_id)
+        )
+        WHERE prospect_id IN ({DUPLICATES})
+    """)
+    op.execute(f"DELETE FROM prospect WHERE id IN ({DUPLICATES})")
+    op.create_index(op.f('ix_prospect_email'), 'prospect', ['email'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_prospect_email'), table_name='prospect')
@@ -0,0 +1,32 @@
+"""Job owner and lease
+
+Revision ID: e7a3c9f1d2b8
+Revises: d8b2e5f9a4c1
+Create Date: 2026-10-17 21:12:05.418337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9f1d2b8'
+down_revision: Union[str, Sequence[str], None] = 'd8b2e5f9a4c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('job', sa.Column('owner', sqlmodel.sql.sqltypes.AutoString(), nullable=True))
+    op.add_column('job', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('job') as batch_op:
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('owner')
@@ -0,0 +1,30 @@
+"""Prospect list sort indexes
+
+Revision ID: f2a8d4c6b1e7
+Revises: e5b1c7d9f3a2
+Create Date: 2026-10-17 16:02:44.508131
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8d4c6b1e7'
+down_revision: Union[str, Sequence[str], None] = 'e5b1c7d9f3a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_prospect_created_at'), 'prospect', ['created_at'], unique=False)
+    op.create_index(op.f('ix_prospect_name'), 'prospect', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_prospect_name'), table_name='prospect')
+    op.drop_index(op.f('ix_prospect_created_at'), table_name='prospect')
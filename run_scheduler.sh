@@ -1,5 +1,7 @@
 #!/usr/bin/env bash
 # 📄 /home/mcd/email-platform/run_scheduler.sh
+# One-shot trigger of POST /run-scheduler (legacy cron entry point; the
+# scheduler daemon, python -m app.scheduler_daemon, now sends continuously)
 
 BASEDIR=/home/mcd/email-platform
 LOGDIR=$BASEDIR/logs
@@ -0,0 +1,199 @@
+# scripts/bench_send.py
+# 📄 End-to-end send benchmark: seeds N prospects + scheduled emails into a
+#    throwaway database and drives a scheduler entry point against the local
+#    SMTP sink, reporting msgs/s, p50/p99 per-message latency and DB queries.
+#
+#   python3 -m scripts.bench_send -n 2000 --latency 0.02
+#   python3 -m scripts.bench_send -n 500 --entry run_scheduler --fail-rate 0.05
+#
+# --db reuses a given database, dropping all its tables first: only a SQLite
+# file under the temp directory is accepted unless --force-drop is passed.
+#
+# Note: send_pending / run_scheduler honour the working-day check, so on a
+# weekend use --entry force.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scripts.smtp_sink import SMTPSink
+
+ENTRIES = ("send_pending", "run_scheduler", "force")
+
+TEMPLATE_BODY = """
+<p>Hi {{ name }},</p>
+<p>I noticed <b>{{ company }}</b> has been growing fast and thought a
+{{ title }} like you might be interested in how teams cut their reporting
+time in half.</p>
+<ul><li>No migration needed</li><li>Works with your current stack</li></ul>
+<p>Worth a quick call next week?</p>
+<p>Best,<br>The Team</p>
+"""
+
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def _is_scratch_db(url: str) -> bool:
+    """A SQLite file under the temp directory (or in memory) – safe to drop_all."""
+    if not url.startswith("sqlite://"):
+        return False
+    path = url.split(":///", 1)[1] if ":///" in url else ""
+    if path in ("", ":memory:"):
+        return True
+    tmp = os.path.realpath(tempfile.gettempdir())
+    return os.path.realpath(path).startswith(tmp + os.sep)
+
+
+def _configure_env(args, sink: SMTPSink) -> None:
+    """Must run before anything under app/ is imported (Settings reads env once)."""
+    if not args.db:
+        fd, path = tempfile.mkstemp(prefix="bench_", suffix=".db")
+        os.close(fd)
+        args.db = f"sqlite:///{path}"
+    os.environ.update(
+        DATABASE_URL=args.db,
+        SMTP_SERVER=sink.host,
+        SMTP_PORT=str(sink.port),
+        SMTP_STARTTLS="false",
+        SMTP_USER="bench@example.com",
+        SMTP_PASSWORD="bench",
+        MAX_EMAILS_PER_DAY=str(args.n * 10),
+    )
+
+
+def _seed(n: int) -> None:
+    from sqlmodel import SQLModel, Session
+    from app.database import engine
+    from app.models import Prospect, EmailTemplate, Sequence, SequenceStep, ScheduledEmail
+
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as s:
+        tpl = EmailTemplate(name="Bench", subject="Quick question, {{ name }}", body=TEMPLATE_BODY)
+        seq = Sequence(name="Bench sequence")
+        s.add_all([tpl, seq])
+        s.commit()
+        s.add(SequenceStep(sequence_id=seq.id, template_id=tpl.id, delay_days=0))
+
+        prospects = [
+            Prospect(name=f"Prospect {i}", email=f"p{i}@bench.example.com",
+                     company=f"Company {i % 97}", title="Head of Ops", sequence_id=seq.id)
+            for i in range(n)
+        ]
+        s.add_all(prospects)
+        s.commit()
+
+        due = datetime.utcnow() - timedelta(minutes=5)
+        s.add_all([
+            ScheduledEmail(prospect_id=p.id, template_id=tpl.id, sequence_id=seq.id,
+                           send_at=due, status="pending")
+            for p in prospects
+        ])
+        s.commit()
+
+
+def _run_entry(entry: str):
+    if entry == "send_pending":
+        from app.main import _send_pending
+        return _send_pending()
+    if entry == "run_scheduler":
+        from app.scheduler import run_scheduler
+        return run_scheduler()
+    from app.main import force_scheduler
+    return force_scheduler()["message"]
+
+
+def _status_counts() -> dict:
+    from sqlmodel import Session, select
+    from sqlalchemy import func
+    from app.database import engine
+    from app.models import ScheduledEmail
+
+    with Session(engine) as s:
+        rows = s.exec(
+            select(ScheduledEmail.status, func.count()).group_by(ScheduledEmail.status)
+        ).all()
+    return {status: count for status, count in rows}
+
+
+def bench(args) -> dict:
+    with SMTPSink(latency=args.latency, fail_rate=args.fail_rate,
+                  disconnect_rate=args.disconnect_rate, seed=args.seed) as sink:
+        _configure_env(args, sink)
+        _seed(args.n)
+
+        from sqlalchemy import event
+        from app.database import engine
+
+        queries = {"n": 0}
+
+        def _count(*_):
+            queries["n"] += 1
+
+        event.listen(engine, "before_cursor_execute", _count)
+        sink.reset()
+        t0 = time.perf_counter()
+        message = _run_entry(args.entry)
+        elapsed = time.perf_counter() - t0
+        event.remove(engine, "before_cursor_execute", _count)
+
+        from app import pipeline
+
+        return {
+            "entry":        args.entry,
+            "result":       message,
+            "scheduled":    args.n,
+            "accepted":     sink.accepted,
+            "failed":       sink.failed,
+            "disconnects":  sink.disconnects,
+            "connections":  sink.connections,
+            "elapsed_s":    round(elapsed, 3),
+            "msgs_per_s":   round(sink.accepted / elapsed, 1) if elapsed else 0.0,
+            "p50_ms":       round(_percentile(sink.latencies, 50) * 1000, 2),
+            "p99_ms":       round(_percentile(sink.latencies, 99) * 1000, 2),
+            "db_queries":   queries["n"],
+            "statuses":     _status_counts(),
+            "stages":       (pipeline.last_report or {}).get("stages"),
+        }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="End-to-end send benchmark against a local SMTP sink")
+    ap.add_argument("-n", type=int, default=1000, help="prospects / scheduled emails to seed")
+    ap.add_argument("--entry", choices=ENTRIES, default="send_pending")
+    ap.add_argument("--latency", type=float, default=0.0, help="SMTP latency per message (s)")
+    ap.add_argument("--fail-rate", type=float, default=0.0)
+    ap.add_argument("--disconnect-rate", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=None, help="RNG seed for injected faults")
+    ap.add_argument("--db", default=None, help="DATABASE_URL (default: temp SQLite file)")
+    ap.add_argument("--force-drop", action="store_true",
+                    help="allow --db to point at a non-temporary database (ALL its tables are dropped)")
+    ap.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = ap.parse_args()
+    if args.db and not args.force_drop and not _is_scratch_db(args.db):
+        ap.error("--db drops and recreates every table; it must be a SQLite file under "
+                 f"{tempfile.gettempdir()} unless --force-drop is given")
+
+    report = bench(args)
+    if args.json:
+        print(json.dumps(report))
+        return
+    print("📊 Send benchmark")
+    for k, v in report.items():
+        print(f"   {k:<12} {v}")
+
+
+if __name__ == "__main__":
+    main()
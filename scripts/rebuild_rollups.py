@@ -0,0 +1,26 @@
+# scripts/rebuild_rollups.py
+# 📄 Recompute the SendRollup analytics counters from the SentEmail table
+#    (after manual data fixes, or if the counters are ever in doubt).
+#
+#   python3 -m scripts.rebuild_rollups
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlmodel import Session
+
+from app import rollups
+from app.database import engine
+
+
+def main() -> None:
+    with Session(engine) as session:
+        rows = rollups.rebuild(session)
+        session.commit()
+    print(f"✅ Rebuilt send rollups: {rows} counter rows.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# scripts/smtp_sink.py
+# 📄 Local SMTP stand-in for benchmarks and dev: accepts, counts and optionally
+#    stores messages, with injectable latency, failures and disconnects.
+#
+# Run standalone:
+#   python3 -m scripts.smtp_sink --port 8025 --latency 0.05 --fail-rate 0.01
+# then point the backend at it:
+#   SMTP_SERVER=127.0.0.1 SMTP_PORT=8025 SMTP_STARTTLS=false
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+from typing import List, Optional
+
+
+class SMTPSink:
+    """
+    Minimal ESMTP server (EHLO/HELO, AUTH PLAIN/LOGIN, MAIL, RCPT, DATA,
+    RSET, NOOP, QUIT) running on its own event loop in a background thread.
+
+    Every accepted message is counted and its transaction time (MAIL FROM →
+    final reply) recorded in `latencies`. With store=True the raw messages
+    are kept in `messages` as (mail_from, rcpt_tos, data) tuples.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        disconnect_rate: float = 0.0,
+        store: bool = False,
+        seed: Optional[int] = None,
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.disconnect_rate = disconnect_rate
+        self.store = store
+        self._rng = random.Random(seed)
+
+        self.accepted = 0
+        self.failed = 0
+        self.disconnects = 0
+        self.connections = 0
+        self.latencies: List[float] = []
+        self.messages: list = []
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    # ────────────── lifecycle ──────────────
+    def start(self) -> "SMTPSink":
+        self._thread = threading.Thread(target=self._run, name="smtp-sink", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def stop(self) -> None:
+        if not self._loop:
+            return
+
+        async def _shutdown():
+            self._server.close()
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(_shutdown(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = None
+
+    def __enter__(self) -> "SMTPSink":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "accepted":    self.accepted,
+            "failed":      self.failed,
+            "disconnects": self.disconnects,
+            "connections": self.connections,
+        }
+
+    def reset(self) -> None:
+        self.accepted = self.failed = self.disconnects = self.connections = 0
+        self.latencies.clear()
+        self.messages.clear()
+
+    # ────────────── protocol ──────────────
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        mail_from, rcpts, started = None, [], None
+        try:
+            await reply("220 smtp-sink ESMTP ready")
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", "replace").rstrip("\r\n")
+                verb, _, arg = line.partition(" ")
+                verb = verb.upper()
+
+                if verb == "EHLO":
+                    await reply("250-smtp-sink\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n250 SIZE 52428800")
+                elif verb == "HELO":
+                    await reply("250 smtp-sink")
+                elif verb == "AUTH":
+                    mech, _, initial = arg.partition(" ")
+                    if mech.upper() == "PLAIN" and not initial:
+                        await reply("334 ")
+                        await reader.readline()
+                    elif mech.upper() == "LOGIN":
+                        if not initial:
+                            await reply("334 VXNlcm5hbWU6")
+                            await reader.readline()
+                        await reply("334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    await reply("235 2.7.0 Authentication successful")
+                elif verb == "MAIL":
+                    mail_from, rcpts, started = arg[5:].strip(), [], time.perf_counter()
+                    await reply("250 2.1.0 OK")
+                elif verb == "RCPT":
+                    rcpts.append(arg[3:].strip())
+                    await reply("250 2.1.5 OK")
+                elif verb == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    chunks = []
+                    while True:
+                        chunk = await reader.readline()
+                        if not chunk or chunk in (b".\r\n", b".\n"):
+                            break
+                        chunks.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    roll = self._rng.random()
+                    if roll < self.disconnect_rate:
+                        self.disconnects += 1
+                        break
+                    if roll < self.disconnect_rate + self.fail_rate:
+                        self.failed += 1
+                        await reply("451 4.3.0 Injected failure")
+                    else:
+                        self.accepted += 1
+                        self.latencies.append(time.perf_counter() - started)
+                        if self.store:
+                            self.messages.append((mail_from, rcpts, b"".join(chunks)))
+                        await reply("250 2.0.0 Queued")
+                    mail_from, rcpts = None, []
+                elif verb == "RSET":
+                    mail_from, rcpts = None, []
+                    await reply("250 2.0.0 OK")
+                elif verb == "NOOP":
+                    await reply("250 2.0.0 OK")
+                elif verb == "QUIT":
+                    await reply("221 2.0.0 Bye")
+                    break
+                else:
+                    await reply("502 5.5.2 Command not recognized")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Local SMTP sink")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8025)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added per message")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="fraction answered 451")
+    ap.add_argument("--disconnect-rate", type=float, default=0.0, help="fraction dropped mid-DATA")
+    args = ap.parse_args()
+
+    sink = SMTPSink(args.host, args.port, args.latency, args.fail_rate, args.disconnect_rate).start()
+    print(f"📮 SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"   {sink.stats}")
+    except KeyboardInterrupt:
+        sink.stop()
@@ -0,0 +1,84 @@
+# tests/conftest.py
+# 📄 Shared fixtures: a throwaway SQLite database, the local SMTP sink
+#    (scripts/smtp_sink.py) and a seeded queue of due emails.
+#
+# Settings are read from the environment once, so DATABASE_URL is pointed at
+# a temp file before anything under app/ is imported.
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_DIR = tempfile.mkdtemp(prefix="email_platform_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ.setdefault("SMTP_USER", "sender@example.com")
+
+from sqlmodel import SQLModel, Session  # noqa: E402
+
+import app.models  # noqa: E402,F401  (registers the tables)
+from app.config import settings  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.models import EmailTemplate, Prospect, ScheduledEmail, Sequence, SequenceStep  # noqa: E402
+from scripts.smtp_sink import SMTPSink  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created, empty tables."""
+    SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    """Local SMTP server the mailers are pointed at (set .fail_rate to inject failures)."""
+    with SMTPSink(seed=1) as sink:
+        monkeypatch.setattr(settings, "SMTP_SERVER", sink.host)
+        monkeypatch.setattr(settings, "SMTP_PORT", sink.port)
+        monkeypatch.setattr(settings, "SMTP_STARTTLS", False)
+        monkeypatch.setattr(settings, "SMTP_PASSWORD", "")
+        yield sink
+
+
+@pytest.fixture
+def sequence(db):
+    """A two-step sequence (day 0 and day 2) using one template."""
+    tpl = EmailTemplate(name="Intro", subject="Hi {{ name }}", body="<p>Hello {{ name }}</p>")
+    seq = Sequence(name="Outreach")
+    db.add_all([tpl, seq])
+    db.commit()
+    db.add_all([
+        SequenceStep(sequence_id=seq.id, template_id=tpl.id, delay_days=0),
+        SequenceStep(sequence_id=seq.id, template_id=tpl.id, delay_days=2),
+    ])
+    db.commit()
+    return seq
+
+
+@pytest.fixture
+def due_emails(db, sequence):
+    """Factory: *n* prospects, each with one ScheduledEmail due five minutes ago."""
+    def _make(n: int) -> list[int]:
+        prospects = [
+            Prospect(name=f"Prospect {i}", email=f"p{i}@example.com", sequence_id=sequence.id)
+            for i in range(n)
+        ]
+        db.add_all(prospects)
+        db.commit()
+        due = datetime.utcnow() - timedelta(minutes=5)
+        rows = [
+            ScheduledEmail(prospect_id=p.id, template_id=1, sequence_id=sequence.id,
+                           send_at=due, status="pending")
+            for p in prospects
+        ]
+        db.add_all(rows)
+        db.commit()
+        return [r.id for r in rows]
+    return _make
@@ -0,0 +1,50 @@
+# tests/test_import.py
+# 📄 POST /prospects/import: raw CSV / NDJSON bodies and multipart uploads
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app.main import app
+from app.models import Prospect
+
+CSV = "﻿Name,Email,Title,Company\r\nJane,Jane@Example.com,CTO,Acme\r\nBob,not-an-email,,\r\nJane D.,jane@example.com,,\r\n"
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _emails(db) -> list:
+    return db.exec(select(Prospect.email).order_by(Prospect.email)).all()
+
+
+def test_raw_csv_body(db, client):
+    r = client.post("/prospects/import", content=CSV.encode(), headers={"Content-Type": "text/csv"})
+
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["rows"], body["inserted"], body["skipped"], body["failed"]) == (3, 1, 1, 1)
+    assert _emails(db) == ["jane@example.com"]
+    assert db.exec(select(Prospect.name)).one() == "Jane"  # later repeat in the batch skipped
+
+
+def test_raw_ndjson_body(db, client):
+    lines = [json.dumps({"name": "A", "email": "a@x.com"}), "", "[1]", json.dumps({"name": "B", "email": "b@x.com"})]
+    r = client.post("/prospects/import", content="\n".join(lines).encode(),
+                    headers={"Content-Type": "application/x-ndjson"})
+
+    assert r.status_code == 200
+    assert r.json()["inserted"] == 2
+    assert _emails(db) == ["a@x.com", "b@x.com"]
+
+
+def test_multipart_upload(db, client):
+    r = client.post("/prospects/import", files={"file": ("prospects.csv", CSV.encode(), "text/csv")})
+
+    assert r.status_code == 200
+    assert r.json()["inserted"] == 1
+    assert _emails(db) == ["jane@example.com"]
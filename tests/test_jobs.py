@@ -0,0 +1,39 @@
+# tests/test_jobs.py
+# 📄 Background job leases: only jobs of processes that are gone are failed
+
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from app import jobs
+from app.models import Job
+
+
+def _job(db, owner, lease_in_s, status="running") -> int:
+    job = Job(kind="assign_sequence", status=status, owner=owner,
+              lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_in_s))
+    db.add(job)
+    db.commit()
+    return job.id
+
+
+def test_recover_fails_only_expired_leases(db):
+    live = _job(db, "api-1:7:aaaa", 30)
+    dead = _job(db, "api-1:7:bbbb", -1)
+    queued_dead = _job(db, "api-2:9:cccc", -1, status="queued")
+    ours = _job(db, jobs.OWNER_ID, 30)
+
+    assert jobs.recover_interrupted() == 2
+    db.expire_all()
+    status = dict(db.exec(select(Job.id, Job.status)).all())
+    assert status == {live: "running", dead: "failed", queued_dead: "failed", ours: "running"}
+
+
+def test_restarted_process_does_not_adopt_its_predecessors_jobs(db):
+    # same hostname:pid as this process (container restart), earlier boot
+    predecessor = _job(db, f"{jobs.WORKER_ID}:0123456789ab", -1)
+
+    assert jobs.renew_leases() == 0
+    assert jobs.recover_interrupted() == 1
+    db.expire_all()
+    assert db.get(Job, predecessor).status == "failed"
@@ -0,0 +1,56 @@
+# tests/test_pagination.py
+# 📄 Keyset pagination: opaque cursors, pages that tile the result, /prospects paging
+
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app import crud, pagination
+from app.main import app
+from app.models import Prospect
+
+
+def test_cursor_round_trip():
+    when = datetime(2026, 3, 1, 12, 30, 15)
+    keys = [Prospect.created_at, Prospect.id]
+    cursor = pagination.encode_cursor([when, 17])
+    assert pagination.decode_cursor(cursor, keys) == [when, 17]
+
+
+def test_keyset_pages_cover_every_row_once(db):
+    crud.upsert_prospects(db, [{"name": f"N{i % 7}", "email": f"u{i}@x.com"} for i in range(53)])
+    db.commit()
+    expected = [p.id for p in db.exec(select(Prospect).order_by(Prospect.name.desc(), Prospect.id.desc()))]
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = pagination.keyset_page(
+            db, select(Prospect), [Prospect.name, Prospect.id], 10, cursor=cursor, descending=True,
+        )
+        seen += [p.id for p in rows]
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_prospects_endpoint_pages_with_filters(db, sequence):
+    crud.upsert_prospects(db, [
+        {"name": f"N{i % 5}", "email": f"u{i}@x.com", "company": "Acme" if i % 2 else "Other"}
+        for i in range(30)
+    ])
+    db.commit()
+    client = TestClient(app)
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "acme", "sort": "name", "order": "desc", "limit": 4, "with_total": True}
+        body = client.get("/prospects", params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        assert body["total"] == 15
+        seen += [p["email"] for p in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == 15
+
+    assert client.get("/prospects", params={"limit": 4, "cursor": "garbage"}).status_code == 400
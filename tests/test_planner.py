@@ -0,0 +1,62 @@
+# tests/test_planner.py
+# 📄 Vectorized send-time planning and capacity-first (per-day load) planning
+
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from sqlmodel import select
+
+from app import crud
+from app.config import settings
+from app.models import Prospect
+from app.planner import WINDOW_END_H, WINDOW_START_H, capacity_first_days, plan_send_times, to_datetimes
+
+
+def test_plan_send_times_is_deterministic_for_a_seed():
+    now = datetime(2026, 1, 5, 8, 0)
+    plan = lambda seed: plan_send_times(50, [0, 2, 5], date(2026, 1, 5), ventilate_days=10, now=now, seed=seed)
+
+    assert np.array_equal(plan(42), plan(42))
+    assert not np.array_equal(plan(42), plan(43))
+    assert plan(42).shape == (50, 3)
+
+
+def test_plan_send_times_stays_in_the_working_window():
+    plan = plan_send_times(200, [0, 1, 3], date(2026, 1, 9), ventilate_days=7,
+                           now=datetime(2026, 1, 1), seed=7)
+    times = np.array(to_datetimes(plan)).reshape(plan.shape)
+
+    assert all(t.weekday() < 5 and WINDOW_START_H <= t.hour < WINDOW_END_H for t in times.ravel())
+    # steps never go back in time (weekend roll may put two on the same Monday)
+    assert all(row[0].date() <= row[1].date() <= row[2].date() for row in times)
+
+
+def test_capacity_first_planning_respects_daily_limit(db, sequence, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_EMAILS_PER_DAY", 10)
+    crud.upsert_prospects(db, [{"name": f"P{i}", "email": f"p{i}@x.com"} for i in range(30)])
+    db.commit()
+    ids = db.exec(select(Prospect.id)).all()
+    start = date(2026, 1, 5)  # a Monday
+
+    for mode in ("greedy", "proportional"):
+        crud.bulk_assign_sequence_to_prospects(db, ids, sequence.id, start_date=start,
+                                               ventilate_days=5, seed=1, planning=mode)
+        per_day = crud.scheduled_per_day(db, start)
+        assert sum(per_day.values()) == 60  # 30 prospects × 2 steps
+        assert max(per_day.values()) <= 10
+        assert all(d.weekday() < 5 for d in per_day)
+
+
+def test_capacity_first_days_counts_existing_load():
+    monday = date(2026, 1, 5)
+    first = capacity_first_days(6, [0], monday, load={monday: 8}, capacity=10)
+
+    days = [d.astype(object) for d in first]
+    assert days.count(monday) == 2  # only the room left on Monday
+    assert days.count(date(2026, 1, 6)) == 4
+
+
+def test_capacity_first_days_raises_when_nothing_fits():
+    with pytest.raises(ValueError):
+        capacity_first_days(5, [0], date(2026, 1, 5), load={}, capacity=1, max_days=3)
@@ -0,0 +1,75 @@
+# tests/test_prospects.py
+# 📄 Prospect CRUD: unique normalized emails, upserts, set-based sequence assignment
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import select
+
+from app import crud
+from app.main import app
+from app.models import Prospect, ScheduledEmail
+from app.utils import normalize_email
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_assign_sequence_ignores_repeated_ids(db, sequence):
+    crud.upsert_prospects(db, [{"name": "A", "email": "a@x.com"}, {"name": "B", "email": "b@x.com"}])
+    db.commit()
+    a, b = db.exec(select(Prospect.id).order_by(Prospect.id)).all()
+
+    crud.bulk_assign_sequence_to_prospects(db, [a, a, b, 999], sequence.id, seed=1)
+
+    rows = db.exec(select(ScheduledEmail.prospect_id)).all()
+    assert sorted(rows) == [a, a, b, b]  # one row per step, not per repeated id
+
+
+def test_normalize_email():
+    assert normalize_email("  Jane.Doe@Example.COM ") == "jane.doe@example.com"
+    assert normalize_email(None) == ""
+
+
+def test_upsert_prospects_dedupes_by_normalized_email(db, sequence):
+    inserted, updated = crud.upsert_prospects(db, [
+        {"name": "Jane", "email": "Jane@Example.com"},
+        {"name": "Jane D.", "email": " jane@example.com "},
+        {"name": "Bob", "email": "bob@example.com"},
+    ])
+    db.commit()
+    assert (inserted, updated) == (2, 0)
+
+    jane = crud.get_prospect_by_email(db, "JANE@example.com")
+    assert jane.name == "Jane D."  # last one in the batch wins
+    jane.sequence_id = sequence.id
+    db.add(jane)
+    db.commit()
+
+    assert crud.upsert_prospects(db, [{"name": "Jane Doe", "email": "jane@EXAMPLE.com"}]) == (0, 1)
+    db.commit()
+    db.refresh(jane)
+    assert jane.name == "Jane Doe"
+    assert jane.sequence_id == sequence.id  # kept on update
+    assert len(db.exec(select(Prospect)).all()) == 2
+
+
+def test_create_prospect_keeps_fields_and_rejects_duplicates(db, sequence, client):
+    r = client.post("/prospects", json={"name": "Jane", "email": " Jane@Example.com ",
+                                        "sequence_id": sequence.id, "unsubscribed": True})
+    assert r.status_code == 200
+    assert (r.json()["email"], r.json()["sequence_id"], r.json()["unsubscribed"]) == \
+        ("jane@example.com", sequence.id, True)
+
+    r = client.post("/prospects", json={"name": "Other", "email": "JANE@example.com"})
+    assert r.status_code == 409
+    assert db.exec(select(Prospect.name)).all() == ["Jane"]  # not overwritten
+
+
+def test_dev_generate_prospects_upserts(db, client, monkeypatch):
+    monkeypatch.setitem(os.environ, "DEV_MODE", "true")
+    assert client.post("/dev/generate-prospects", params={"n": 5}).json() == {"added": 5, "updated": 0}
+    assert len(db.exec(select(Prospect)).all()) == 5
@@ -0,0 +1,97 @@
+# tests/test_rate_limit.py
+# 📄 Send-rate limiter: one quota shared through the database, and refunds
+#    for sends that fail or never happen
+
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app import main, pipeline
+from app.config import settings
+from app.database import engine
+from app.models import ScheduledEmail, SentEmail
+from app.rate_limit import RateLimiter
+from app.send_queue import load_send_context
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """Global day cap 100 plus a 50/day cap for SMTP_USER, used by the pipeline."""
+    limiter = RateLimiter({"day": 100}, {settings.SMTP_USER.lower(): {"day": 50}})
+    monkeypatch.setattr(pipeline, "rate_limiter", limiter)
+    return limiter
+
+
+def test_rate_limit_quota_is_shared_across_sessions(db):
+    limiter = RateLimiter({"day": 10}, {})
+    with Session(engine) as a, Session(engine) as b:
+        granted = [limiter.acquire(s, 4) for s in (a, b, a, b)]
+        assert granted == [4, 4, 2, 0]
+        limiter.release(b, 3)
+        assert limiter.available(a) == 3
+        assert limiter.snapshot(a)["global:day"]["available"] == 3
+
+
+def test_cold_start_seeds_buckets_from_recent_sends(db):
+    db.add_all([SentEmail(to=f"p{i}@x.com", subject="s", status="sent", sent_at=datetime.utcnow())
+                for i in range(3)])
+    db.commit()
+    limiter = RateLimiter({"day": 10, "hour": 5}, {})
+
+    assert limiter.available(db) == 2  # hour bucket: 5 - 3
+    assert limiter.acquire(db, 5) == 2
+    assert limiter.snapshot(db)["global:day"]["available"] == 5
+
+
+def test_rate_limits_endpoint_reads_the_shared_rows(db, monkeypatch):
+    limiter = RateLimiter({"day": 10}, {})
+    monkeypatch.setattr(main, "rate_limiter", limiter)
+    with Session(engine) as other:  # e.g. the scheduler daemon
+        limiter.acquire(other, 7)
+
+    body = TestClient(main.app).get("/rate-limits").json()
+    assert body["buckets"]["global:day"]["available"] == 3
+
+
+def _levels(limiter) -> dict:
+    with Session(engine) as session:
+        return {key: b["available"] for key, b in limiter.snapshot(session).items()}
+
+
+def test_failed_sends_are_refunded_to_every_bucket(db, due_emails, smtp_sink, limiter):
+    due_emails(20)
+    smtp_sink.fail_rate = 0.5
+
+    run = pipeline.run_pipeline(datetime.utcnow())
+
+    assert 0 < run.sent < 20 and run.processed == 20
+    assert _levels(limiter) == {
+        "global:day": 100 - run.sent,
+        f"sender:{settings.SMTP_USER.lower()}:day": 50 - run.sent,
+    }
+
+
+def test_aborted_run_releases_unsent_claims_and_tokens(db, due_emails, smtp_sink, limiter, monkeypatch):
+    due_emails(40)
+    monkeypatch.setattr(settings, "SEND_CLAIM_BATCH", 10)
+    calls = []
+
+    def fail_second_round(session, batch):
+        calls.append(len(batch))
+        if len(calls) == 2:
+            raise RuntimeError("load failed")
+        return load_send_context(session, batch)
+
+    monkeypatch.setattr(pipeline, "load_send_context", fail_second_round)
+    with pytest.raises(RuntimeError):
+        pipeline.run_pipeline(datetime.utcnow())
+
+    statuses = db.exec(select(ScheduledEmail.status)).all()
+    assert statuses.count("claimed") == 0
+    sent = statuses.count("sent")
+    assert _levels(limiter) == {
+        "global:day": 100 - sent,
+        f"sender:{settings.SMTP_USER.lower()}:day": 50 - sent,
+    }
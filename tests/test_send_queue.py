@@ -0,0 +1,39 @@
+# tests/test_send_queue.py
+# 📄 The ScheduledEmail work queue: concurrent claims never overlap, expired ones return
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models import ScheduledEmail
+from app.send_queue import claim_due, release_expired_claims
+
+
+def test_claims_are_exclusive_across_sessions(db, due_emails):
+    ids = due_emails(25)
+    now = datetime.utcnow()
+    with Session(engine) as a, Session(engine) as b:
+        first = [e.id for e in claim_due(a, now, limit=15)]
+        second = [e.id for e in claim_due(b, now, limit=15)]
+        third = claim_due(a, now, limit=15)
+
+    assert len(first) == 15 and len(second) == 10 and third == []
+    assert not set(first) & set(second)
+    assert sorted(first + second) == sorted(ids)
+
+
+def test_expired_claims_go_back_to_the_queue(db, due_emails):
+    due_emails(5)
+    now = datetime.utcnow()
+    with Session(engine) as a:
+        stuck = [e.id for e in claim_due(a, now)]
+    db.exec(update(ScheduledEmail).values(claim_expires_at=now - timedelta(seconds=1)))
+    db.commit()
+
+    with Session(engine) as b:
+        reclaimed = [e.id for e in claim_due(b, now, limit=2)]
+        assert len(reclaimed) == 2 and set(reclaimed) <= set(stuck)
+        assert release_expired_claims(b) == 3
+    assert db.exec(select(ScheduledEmail.status)).all().count("pending") == 3
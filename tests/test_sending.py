@@ -0,0 +1,22 @@
+# tests/test_sending.py
+# 📄 End-to-end sending against the local SMTP sink
+
+from datetime import datetime
+
+from sqlmodel import select
+
+from app.models import SentEmail
+from app.pipeline import run_pipeline
+
+
+def test_pipeline_sends_through_the_sink(db, due_emails, smtp_sink):
+    due_emails(30)
+    smtp_sink.fail_rate = 0.2
+
+    run = run_pipeline(datetime.utcnow(), rate_limited=False)
+
+    assert run.processed == 30
+    assert run.sent == smtp_sink.accepted
+    statuses = db.exec(select(SentEmail.status)).all()
+    assert statuses.count("sent") == smtp_sink.accepted
+    assert len(statuses) == 30